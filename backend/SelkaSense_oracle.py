@@ -0,0 +1,26 @@
+"""
+Backend entry point: serves the batching scoring API.
+
+    python -m backend.SelkaSense_oracle
+
+Settings come from the environment (see backend/settings/config_.env.example).
+"""
+import os
+
+from backend.services.scoring_service import create_app
+
+
+def main() -> None:
+    app = create_app(
+        max_batch=int(os.getenv("SCORING_MAX_BATCH", "64")),
+        max_wait=float(os.getenv("SCORING_MAX_WAIT_MS", "0")) / 1000.0,
+    )
+    app.run(
+        host=os.getenv("SCORING_HOST", "0.0.0.0"),
+        port=int(os.getenv("SCORING_PORT", "8080")),
+        threaded=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Indexed wallet flow graph for multi-hop path extraction.
+
+Builds a CSR (compressed sparse row) adjacency over interned wallet IDs from
+the same transaction dicts ``_trace_matrix`` consumes, then enumerates
+bounded-depth paths from a source wallet without any RPC round-trips.
+Proxy wallets are flagged with the ``proxy_map`` rules, so the resulting hop
+lists can go straight into ``dark_track``.
+
+Paths come back as a ``PathBatch``: one flat array of node IDs plus an
+offsets array (path *i* is ``nodes[offsets[i]:offsets[i + 1]]``).
+"""
+from array import array
+from collections import OrderedDict, defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Tuple
+
+from backend.engine.monitoring._flow_sketch import flow_pair
+from backend.engine.tasks.proxy_map import UNKNOWN_WALLET, is_proxy
+
+
+class PathBatch:
+    """Compact set of paths: ``nodes`` (int64 IDs) sliced by ``offsets``."""
+
+    def __init__(self, graph: "FlowGraph", nodes: array, offsets: array) -> None:
+        self.graph = graph
+        self.nodes = nodes
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def path(self, i: int) -> array:
+        return self.nodes[self.offsets[i]:self.offsets[i + 1]]
+
+    def lengths(self) -> List[int]:
+        off = self.offsets
+        return [off[i + 1] - off[i] for i in range(len(off) - 1)]
+
+    def proxy_counts(self) -> List[int]:
+        proxy = self.graph.proxy
+        return [sum(proxy[n] for n in self.path(i)) for i in range(len(self))]
+
+    def tx_paths(self) -> List[List[str]]:
+        """Hop lists with proxies replaced by ``unknown_wallet`` (``dark_track`` input)."""
+        labels = self.graph.labels
+        return [[labels[n] for n in self.path(i)] for i in range(len(self))]
+
+
+class FlowGraph:
+    """
+    Immutable CSR flow graph.
+
+    • ``names[i]``   original wallet of node *i*
+    • ``labels[i]``  name after proxy resolution
+    • ``proxy[i]``   1 if node *i* is a proxy / ``unknown_wallet``
+    • ``indptr`` / ``indices`` / ``weights``  CSR adjacency (summed amounts)
+    """
+
+    def __init__(self, edges: Dict[Tuple[int, int], float], names: List[Hashable],
+                 proxy_marker: str = "proxy_", cache_size: int = 1024) -> None:
+        n = len(names)
+        self.names = names
+        self.ids: Dict[Hashable, int] = {name: i for i, name in enumerate(names)}
+        self.proxy = bytearray(1 if is_proxy(str(name), proxy_marker) else 0 for name in names)
+        self.labels = [UNKNOWN_WALLET if flag else str(name) for name, flag in zip(names, self.proxy)]
+
+        # counting sort of edges by source
+        degree = [0] * (n + 1)
+        for src, _dst in edges:
+            degree[src + 1] += 1
+        for i in range(n):
+            degree[i + 1] += degree[i]
+        self.indptr = array("q", degree)
+        self.indices = array("q", bytes(8 * len(edges)))
+        self.weights = array("d", bytes(8 * len(edges)))
+        fill = degree[:-1]
+        for (src, dst), amount in edges.items():
+            pos = fill[src]
+            self.indices[pos] = dst
+            self.weights[pos] = amount
+            fill[src] = pos + 1
+
+        self.cache_size = cache_size
+        self._reach_cache: "OrderedDict[Tuple[int, int], FrozenSet[int]]" = OrderedDict()
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Dict], proxy_marker: str = "proxy_",
+                          cache_size: int = 1024) -> "FlowGraph":
+        ids: Dict[Hashable, int] = {}
+        names: List[Hashable] = []
+        edges: Dict[Tuple[int, int], float] = defaultdict(float)
+        for tx in transactions:
+            pair = []
+            for wallet in flow_pair(tx):
+                wid = ids.get(wallet)
+                if wid is None:
+                    wid = ids[wallet] = len(names)
+                    names.append(wallet)
+                pair.append(wid)
+            edges[(pair[0], pair[1])] += tx.get("amount", 0)
+        return cls(edges, names, proxy_marker, cache_size)
+
+    # ------------------------------------------------------------------ #
+    #  Lookups                                                           #
+    # ------------------------------------------------------------------ #
+
+    def node(self, wallet: Hashable) -> int:
+        return self.ids[wallet]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def successors(self, node: int) -> array:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    # ------------------------------------------------------------------ #
+    #  Traversal                                                         #
+    # ------------------------------------------------------------------ #
+
+    def reachable(self, wallet: Hashable, max_depth: int = 6) -> FrozenSet[int]:
+        """Node IDs reachable within *max_depth* hops (BFS, LRU-cached per wallet)."""
+        src = self.ids[wallet]
+        key = (src, max_depth)
+        cached = self._reach_cache.get(key)
+        if cached is not None:
+            self._reach_cache.move_to_end(key)
+            return cached
+
+        indptr, indices = self.indptr, self.indices
+        seen = {src}
+        frontier = [src]
+        for _ in range(max_depth):
+            nxt = []
+            for u in frontier:
+                for v in indices[indptr[u]:indptr[u + 1]]:
+                    if v not in seen:
+                        seen.add(v)
+                        nxt.append(v)
+            if not nxt:
+                break
+            frontier = nxt
+
+        result = frozenset(seen)
+        self._reach_cache[key] = result
+        if len(self._reach_cache) > self.cache_size:
+            self._reach_cache.popitem(last=False)
+        return result
+
+    def paths_from(self, wallet: Hashable, max_depth: int = 6, max_paths: int = 10_000,
+                   min_amount: float = 0.0) -> PathBatch:
+        """
+        Enumerate maximal simple paths starting at *wallet* (DFS).
+
+        A path ends when it has *max_depth* hops or its last node has no
+        unvisited successor over an edge carrying at least *min_amount*.
+        At most *max_paths* paths are returned.
+        """
+        src = self.ids[wallet]
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        nodes = array("q")
+        offsets = array("q", [0])
+        on_path = bytearray(len(self.names))
+
+        path = [src]
+        on_path[src] = 1
+        # stack of next-edge cursors, one per node on the current path
+        cursors = [indptr[src]]
+        extended = [False]
+
+        while cursors and len(offsets) <= max_paths:
+            u = path[-1]
+            pos = cursors[-1]
+            end = indptr[u + 1]
+            advanced = False
+            if len(path) <= max_depth:
+                while pos < end:
+                    v = indices[pos]
+                    pos += 1
+                    if not on_path[v] and weights[pos - 1] >= min_amount:
+                        cursors[-1] = pos
+                        extended[-1] = True
+                        path.append(v)
+                        on_path[v] = 1
+                        cursors.append(indptr[v])
+                        extended.append(False)
+                        advanced = True
+                        break
+            if advanced:
+                continue
+            # no further extension from u: emit if this is a leaf of the search
+            if not extended[-1] and len(path) > 1:
+                nodes.extend(path)
+                offsets.append(len(nodes))
+            on_path[u] = 0
+            path.pop()
+            cursors.pop()
+            extended.pop()
+
+        return PathBatch(self, nodes, offsets)
+
+    def tx_paths(self, wallet: Hashable, max_depth: int = 6, max_paths: int = 10_000,
+                 min_amount: float = 0.0) -> List[List[str]]:
+        """Proxy-resolved hop lists from *wallet*, ready for ``dark_track``."""
+        return self.paths_from(wallet, max_depth, max_paths, min_amount).tx_paths()
+
+
+# ----------------------------- Quick demo ----------------------------- #
+# python -m backend.engine.monitoring._flow_graph
+if __name__ == "__main__":
+    import random
+    import time
+    from collections import Counter
+
+    from backend.engine.services.session_service import dark_track
+
+    random.seed(5)
+    n_wallets, n_tx = 100_000, 400_000
+    wallets = [f"proxy_{i}" if i % 40 == 0 else f"W{i}" for i in range(n_wallets)]
+    txs = [{"src": random.choice(wallets), "dst": random.choice(wallets), "amount": random.random() * 10}
+           for _ in range(n_tx)]
+
+    t0 = time.perf_counter()
+    graph = FlowGraph.from_transactions(txs)
+    print(f"built CSR: {len(graph):,} wallets, {len(graph.indices):,} edges in {time.perf_counter() - t0:.2f}s")
+
+    suspect = txs[0]["src"]
+    t0 = time.perf_counter()
+    batch = graph.paths_from(suspect, max_depth=6, max_paths=5_000)
+    t_paths = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    statuses = Counter(dark_track(p).name for p in batch.tx_paths())
+    t_classify = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reach = graph.reachable(suspect, max_depth=4)
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    graph.reachable(suspect, max_depth=4)
+    t_hot = time.perf_counter() - t0
+
+    print(f"{len(batch):,} paths ({len(batch.nodes):,} ids) from {suspect} in {t_paths * 1000:.1f} ms; "
+          f"dark_track in {t_classify * 1000:.1f} ms: {dict(statuses)}")
+    print(f"reachable(≤4 hops)={len(reach):,}: cold {t_cold * 1000:.1f} ms, cached {t_hot * 1e6:.1f} µs")
@@ -0,0 +1,348 @@
+"""
+Append-only, memory-mapped store of per-token (timestamp, value) series.
+
+Layout on disk (one directory per store):
+
+    seg-000001.ts      float64 timestamps, grouped by token, time-ordered
+    seg-000001.val     float64 values, same order as .ts
+    seg-000001.json    {"index": {token: [start, end]}, "replaces": [segment names]}
+
+Appends are buffered in memory and written out as a new immutable segment by
+``flush()``; a segment only becomes visible once its index file exists, so
+readers never see half-written data.  Segment numbers are claimed with an
+exclusive create, so several processes may append to the same directory.
+Reads go through ``np.memmap`` and return views, so warming a detector or
+slicing a backtest range does not copy the file.
+
+``compact()`` merges all segments into one, after which every token's history
+is a single contiguous slice.  The merged segment lists the segments it
+replaces; publishing its index hides them in one atomic rename, and their
+files are deleted afterwards (or by the next ``compact()`` after a crash).
+Only one process may compact a directory at a time (``compact.lock``).
+"""
+import json
+import os
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SEGMENT_PREFIX = "seg-"
+LOCK_NAME = "compact.lock"
+DTYPE = np.dtype("<f8")
+
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+class _Segment:
+    """One immutable segment: two memory-mapped columns and a row index."""
+
+    def __init__(self, base: Path) -> None:
+        self.base = base
+        with open(base.with_suffix(".json"), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if not isinstance(meta.get("index"), dict):     # pre-"replaces" layout: bare index
+            meta = {"index": meta, "replaces": []}
+        self.index: Dict[str, Tuple[int, int]] = {k: tuple(v) for k, v in meta["index"].items()}
+        self.replaces: List[str] = list(meta.get("replaces", ()))
+        # a merged segment sorts where its newest input did, ahead of segments
+        # other writers flushed while the compaction ran
+        self.order = (max(self.replaces, default=base.name), base.name)
+        rows = max((end for _start, end in self.index.values()), default=0)
+        if rows:
+            self.ts = np.memmap(base.with_suffix(".ts"), dtype=DTYPE, mode="r", shape=(rows,))
+            self.val = np.memmap(base.with_suffix(".val"), dtype=DTYPE, mode="r", shape=(rows,))
+        else:
+            self.ts = self.val = np.empty(0, dtype=DTYPE)
+
+    def get(self, token: str) -> Optional[Series]:
+        span = self.index.get(token)
+        if span is None:
+            return None
+        start, end = span
+        return self.ts[start:end], self.val[start:end]
+
+    def files(self) -> List[Path]:
+        return [self.base.with_suffix(s) for s in (".json", ".ts", ".val")]
+
+
+class SeriesStore:
+    """
+    Columnar time-series store keyed by token.
+
+    • ``append`` / ``append_many`` buffer new points in memory
+    • ``flush`` persists the buffer as a new segment (auto after *flush_every* points)
+    • ``series`` / ``tail`` / ``range`` return zero-copy views where possible
+    """
+
+    def __init__(self, root: Union[str, Path], flush_every: int = 1_000_000) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self._segments: List[_Segment] = []
+        self._pending: Dict[str, Tuple[List[float], List[float]]] = {}
+        self._pending_count = 0
+        self.refresh()
+
+    # ------------------------------------------------------------------ #
+    #  Writing                                                           #
+    # ------------------------------------------------------------------ #
+
+    def append(self, token: str, ts: float, value: float) -> None:
+        ts_buf, val_buf = self._pending.setdefault(token, ([], []))
+        ts_buf.append(float(ts))
+        val_buf.append(float(value))
+        self._pending_count += 1
+        if self._pending_count >= self.flush_every:
+            self.flush()
+
+    def append_many(self, token: str, ts: Iterable[float], values: Iterable[float]) -> None:
+        ts_list = [float(t) for t in ts]
+        val_list = [float(v) for v in values]
+        if len(ts_list) != len(val_list):
+            raise ValueError("ts and values must have the same length")
+        ts_buf, val_buf = self._pending.setdefault(token, ([], []))
+        ts_buf.extend(ts_list)
+        val_buf.extend(val_list)
+        self._pending_count += len(ts_list)
+        if self._pending_count >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> Optional[Path]:
+        """Write buffered points as a new segment; returns its base path."""
+        if not self._pending_count:
+            return None
+        columns = {}
+        for token, (ts_buf, val_buf) in self._pending.items():
+            ts = np.asarray(ts_buf, dtype=DTYPE)
+            order = np.argsort(ts, kind="stable")
+            columns[token] = (ts[order], np.asarray(val_buf, dtype=DTYPE)[order])
+        base = self._write_segment(columns)
+        self._pending.clear()
+        self._pending_count = 0
+        return base
+
+    def compact(self) -> Optional[Path]:
+        """
+        Merge all segments (and pending points) into a single segment.
+
+        Raises ``RuntimeError`` if another process holds the compaction lock.
+        """
+        self.flush()
+        lock = self.root / LOCK_NAME
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            raise RuntimeError(f"{lock} exists: another compaction is running (remove it if stale)") from None
+        try:
+            self.refresh()
+            self._remove_replaced()
+            if len(self._segments) <= 1:
+                return self._segments[0].base if self._segments else None
+            old = list(self._segments)
+            columns = {token: self.series(token) for token in self.tokens()}  # time-ordered merge
+            base = self._write_segment(columns, replaces=[seg.base.name for seg in old])
+            self._segments = [seg for seg in self._segments if seg not in old]
+            self._remove_replaced()
+            return base
+        finally:
+            lock.unlink(missing_ok=True)
+
+    def _remove_replaced(self) -> None:
+        """Delete files of segments that a published segment replaces."""
+        for seg in list(self._segments):
+            for name in seg.replaces:
+                for suffix in (".json", ".ts", ".val"):
+                    (self.root / name).with_suffix(suffix).unlink(missing_ok=True)
+
+    def _claim_segment(self) -> Tuple[Path, BinaryIO, BinaryIO]:
+        """Pick the next free segment number; exclusive create guards against other writers."""
+        while True:
+            seqs = [int(p.name[len(SEGMENT_PREFIX):].split(".")[0])
+                    for p in self.root.glob(f"{SEGMENT_PREFIX}*")]
+            base = self.root / f"{SEGMENT_PREFIX}{max(seqs, default=0) + 1:06d}"
+            try:
+                ts_fh = open(base.with_suffix(".ts"), "xb")
+            except FileExistsError:
+                continue
+            try:
+                val_fh = open(base.with_suffix(".val"), "xb")
+            except BaseException:
+                ts_fh.close()
+                base.with_suffix(".ts").unlink(missing_ok=True)
+                raise
+            return base, ts_fh, val_fh
+
+    def _write_segment(self, columns: Mapping[str, Series], replaces: Sequence[str] = ()) -> Path:
+        base, ts_fh, val_fh = self._claim_segment()
+        index: Dict[str, List[int]] = {}
+        offset = 0
+        with ts_fh, val_fh:
+            for token, (ts, val) in columns.items():
+                if not len(ts):
+                    continue
+                np.asarray(ts, dtype=DTYPE).tofile(ts_fh)
+                np.asarray(val, dtype=DTYPE).tofile(val_fh)
+                index[token] = [offset, offset + len(ts)]
+                offset += len(ts)
+            ts_fh.flush()
+            val_fh.flush()
+            os.fsync(ts_fh.fileno())
+            os.fsync(val_fh.fileno())
+        # the index is written last: its presence marks the segment complete
+        tmp = base.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"index": index, "replaces": list(replaces)}, fh, separators=(",", ":"))
+        os.replace(tmp, base.with_suffix(".json"))
+        self._segments.append(_Segment(base))
+        self._segments.sort(key=lambda seg: seg.order)
+        return base
+
+    # ------------------------------------------------------------------ #
+    #  Reading                                                           #
+    # ------------------------------------------------------------------ #
+
+    def refresh(self) -> None:
+        """Pick up segments written (or compacted away) by other processes."""
+        known = {seg.base for seg in self._segments}
+        for idx in sorted(self.root.glob(f"{SEGMENT_PREFIX}*.json")):
+            base = idx.with_suffix("")
+            if base not in known:
+                try:
+                    self._segments.append(_Segment(base))
+                except FileNotFoundError:       # removed by a concurrent compact()
+                    continue
+        replaced = {name for seg in self._segments for name in seg.replaces}
+        self._segments = [seg for seg in self._segments if seg.base.name not in replaced]
+        self._segments.sort(key=lambda seg: seg.order)
+
+    def tokens(self) -> List[str]:
+        seen: Dict[str, None] = {}
+        for seg in self._segments:
+            seen.update(dict.fromkeys(seg.index))
+        return list(seen)
+
+    def _parts(self, token: str) -> List[Series]:
+        return [part for part in (seg.get(token) for seg in self._segments) if part is not None]
+
+    def series(self, token: str) -> Series:
+        """Full persisted history of *token* as (ts, values), time-ordered."""
+        return _merge(self._parts(token))
+
+    def tail(self, token: str, n: int) -> np.ndarray:
+        """Last *n* values of *token* by timestamp, oldest first."""
+        if n <= 0:
+            return np.empty(0, dtype=DTYPE)
+        parts = self._parts(token)
+        if not _in_order(parts):
+            # late data was flushed after newer points: sort the whole history
+            return _merge(parts)[1][-n:]
+        chunks: List[np.ndarray] = []
+        need = n
+        for _ts, val in reversed(parts):
+            chunks.append(val[-need:])
+            need -= len(chunks[-1])
+            if need <= 0:
+                break
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            return np.empty(0, dtype=DTYPE)
+        return np.concatenate(chunks[::-1])
+
+    def range(self, token: str, start: float, end: float) -> Series:
+        """Points of *token* with ``start <= ts < end``, time-ordered."""
+        parts: List[Series] = []
+        for ts, val in self._parts(token):
+            lo, hi = np.searchsorted(ts, [start, end], side="left")
+            if hi > lo:
+                parts.append((ts[lo:hi], val[lo:hi]))
+        return _merge(parts)
+
+
+def _in_order(parts: Sequence[Series]) -> bool:
+    """True if each part starts no earlier than the previous one ends."""
+    return all(prev[0][-1] <= cur[0][0] for prev, cur in zip(parts, parts[1:]))
+
+
+def _merge(parts: Sequence[Series]) -> Series:
+    """
+    Concatenate per-segment slices (each already sorted) into one time-ordered
+    series.  Slices from segments flushed out of time order are merged with a
+    stable sort, so equal timestamps keep flush order.
+    """
+    if not parts:
+        return np.empty(0, dtype=DTYPE), np.empty(0, dtype=DTYPE)
+    if len(parts) == 1:
+        return parts[0]
+    ts = np.concatenate([p[0] for p in parts])
+    val = np.concatenate([p[1] for p in parts])
+    if not _in_order(parts):
+        order = np.argsort(ts, kind="stable")
+        ts, val = ts[order], val[order]
+    return ts, val
+
+
+# ---------------------------------------------------------------------------
+# Detector warm-up
+# ---------------------------------------------------------------------------
+
+def _window_len(detector) -> int:
+    """Window length of StreamWatch / AnomalyScanner / SignalProcessor."""
+    window = getattr(detector, "buffer", None)
+    if window is None:
+        window = detector.window
+    return window.maxlen or 0
+
+
+def warm_detectors(store: SeriesStore, detectors: Mapping[str, object]) -> int:
+    """
+    Fill each detector's window from the tail of its token's history.
+
+    *detectors* maps token → detector instance (anything with ``warm()`` and a
+    ``buffer``/``window`` deque).  Detectors with a ``rollup`` get the whole
+    history within the rollup's horizon, with timestamps, so the long
+    baselines are restored too.  Returns the number of points loaded.
+    """
+    loaded = 0
+    for token, detector in detectors.items():
+        rollup = getattr(detector, "rollup", None)
+        if rollup is not None:
+            ts, _val = store.series(token)
+            if not len(ts):
+                continue
+            ts, values = store.range(token, float(ts[-1]) - rollup.horizon, np.inf)
+            detector.warm(values.tolist(), ts.tolist())
+        else:
+            values = store.tail(token, _window_len(detector))
+            if not len(values):
+                continue
+            detector.warm(values.tolist())
+        loaded += len(values)
+    return loaded
+
+
+# ----------------------------- Quick demo ----------------------------- #
+# python -m backend.engine.monitoring._series_store
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from backend.logic.analysis_engine import AnomalyScanner
+
+    n_tokens, n_points = 5_000, 400
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SeriesStore(tmp)
+        rng = np.random.default_rng(7)
+        t0 = time.perf_counter()
+        ts = np.arange(n_points, dtype=DTYPE)
+        for i in range(n_tokens):
+            store.append_many(f"token{i}", ts, rng.normal(100, 5, n_points))
+        store.flush()
+        print(f"wrote {n_tokens * n_points:,} points in {time.perf_counter() - t0:.2f}s")
+
+        reopened = SeriesStore(tmp)
+        windows = {f"token{i}": AnomalyScanner(window_size=300) for i in range(n_tokens)}
+        t0 = time.perf_counter()
+        loaded = warm_detectors(reopened, windows)
+        print(f"warmed {n_tokens:,} windows ({loaded:,} points) in {time.perf_counter() - t0:.2f}s")
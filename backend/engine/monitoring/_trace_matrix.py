@@ -1,6 +1,8 @@
-import numpy as np
+# numpy is only needed once a matrix is actually built
 
 def compute_flow_matrix(transactions):
+    import numpy as np
+
     matrix = np.zeros((10, 10))
     for tx in transactions:
         src = tx.get('src_index', 0)
@@ -10,5 +12,7 @@ def compute_flow_matrix(transactions):
     return matrix
 
 def detect_flow_anomalies(matrix):
+    import numpy as np
+
     threshold = np.mean(matrix) * 2
-    return [(i, j) for i in range(len(matrix)) for j in range(len(matrix[i])) if matrix[i][j] > threshold]
\ No newline at end of file
+    return [(i, j) for i in range(len(matrix)) for j in range(len(matrix[i])) if matrix[i][j] > threshold]
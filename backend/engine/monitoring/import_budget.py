@@ -0,0 +1,76 @@
+"""
+Import-time budget check for the Python entry points.
+
+Each entry point is imported in a fresh interpreter under
+``python -X importtime`` and its cumulative import time is compared to the
+budget below.  Run from the repository root:
+
+    python backend/engine/monitoring/import_budget.py
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[3]
+
+# cumulative import time budget per entry point, in milliseconds
+BUDGET_MS: Dict[str, float] = {
+    "background-processes/tasks/mintAnomalyScanner.py": 15.0,
+    "background-processes/helpers/Utils.py": 5.0,
+    "backend/engine/monitoring/_trace_matrix.py": 5.0,
+    "backend/engine/monitoring/logger_config.py": 5.0,
+    "backend/engine/security/_veil_guard.py": 5.0,
+    "backend/engine/security/__access_limiter.py": 40.0,
+    "backend/engine/services/session_service.py": 40.0,
+    "backend/engine/services/token_service.py": 5.0,
+    "backend/engine/tasks/async_worker.py": 5.0,
+    "backend/engine/tasks/cron_scheduler.py": 40.0,
+    "backend/engine/tasks/oracle.py": 5.0,
+    "backend/engine/tasks/proxy_map.py": 20.0,
+}
+
+RUNS = 5
+
+
+def measure_import_ms(entry: str) -> Optional[float]:
+    """Cumulative import time of *entry* (best of RUNS), or None if it failed."""
+    path = ROOT / entry
+    env = dict(os.environ, PYTHONPATH=str(path.parent))
+    best: Optional[float] = None
+
+    for _ in range(RUNS):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {path.stem}"],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            return None
+        for line in proc.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == path.stem:
+                ms = int(parts[1]) / 1000.0
+                best = ms if best is None else min(best, ms)
+    return best
+
+
+def check_budget() -> bool:
+    ok = True
+    for entry, budget in BUDGET_MS.items():
+        ms = measure_import_ms(entry)
+        if ms is None:
+            print(f"[FAIL] {entry}: import failed")
+            ok = False
+            continue
+        status = "OK" if ms <= budget else "OVER"
+        ok = ok and ms <= budget
+        print(f"[{status}] {entry}: {ms:.2f} ms (budget {budget:.1f} ms)")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_budget() else 1)
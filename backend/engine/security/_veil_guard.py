@@ -1,5 +1,4 @@
 import time
-import random
 
 def dark_track(tx_path):
     if len(tx_path) > 5 and tx_path.count('unknown_wallet') >= 2:
@@ -0,0 +1,188 @@
+
+from collections import OrderedDict
+from time import time
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from backend.engine.services.session_service import RiskParams, RiskRating, risk_alert
+
+
+class _Window:
+    """Ring of per-bucket alert counts for one token."""
+
+    __slots__ = ("counts", "total", "epoch", "touched", "rating")
+
+    def __init__(self, buckets: int, epoch: int, now: float) -> None:
+        self.counts = [0] * buckets
+        self.total = 0
+        self.epoch = epoch
+        self.touched = now
+        self.rating: Optional[RiskRating] = None   # last rating seen by risk_alert()
+
+    def advance(self, epoch: int) -> None:
+        """Expire buckets that fell out of the window (at most one full ring)."""
+        gap = epoch - self.epoch
+        if gap <= 0:
+            return
+        n = len(self.counts)
+        if gap >= n:
+            self.counts = [0] * n
+            self.total = 0
+        else:
+            for step in range(1, gap + 1):
+                idx = (self.epoch + step) % n
+                self.total -= self.counts[idx]
+                self.counts[idx] = 0
+        self.epoch = epoch
+
+
+class AlertCounterStore:
+    """
+    Per-token count of alerts raised within the last *window* seconds.
+
+    • bucketed sliding window: *buckets* slots of window/buckets seconds each
+    • O(1) increment / query per token, bulk query for a batch of tokens
+    • tokens idle for longer than *ttl* seconds are evicted (ttl ≥ window,
+      default 2 × window)
+    """
+
+    def __init__(
+        self,
+        window: float = 3600.0,
+        buckets: int = 12,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        self.window = window
+        self.buckets = buckets
+        self.width = window / buckets
+        if ttl is None:
+            ttl = 2 * window
+        if ttl < window:
+            raise ValueError(f"ttl ({ttl}) must not be shorter than window ({window})")
+        self.ttl = ttl
+        self.clock = clock
+        self._tokens: "OrderedDict[str, _Window]" = OrderedDict()   # least recently touched first
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def _epoch(self, now: float) -> int:
+        return int(now // self.width)
+
+    def increment(self, token: str, n: int = 1, now: Optional[float] = None) -> int:
+        """Record *n* alerts for *token*; returns its current count."""
+        now = self.clock() if now is None else now
+        epoch = self._epoch(now)
+        win = self._tokens.get(token)
+        if win is None:
+            win = self._tokens[token] = _Window(self.buckets, epoch, now)
+        else:
+            win.advance(epoch)
+            self._tokens.move_to_end(token)
+        win.counts[epoch % self.buckets] += n
+        win.total += n
+        win.touched = now
+        self.evict_idle(now)
+        return win.total
+
+    def count(self, token: str, now: Optional[float] = None) -> int:
+        """Alerts for *token* within the window (0 for unknown tokens)."""
+        win = self._tokens.get(token)
+        if win is None:
+            return 0
+        win.advance(self._epoch(self.clock() if now is None else now))
+        return win.total
+
+    def counts(self, tokens: Iterable[str], now: Optional[float] = None) -> List[int]:
+        """Bulk ``count`` for a batch of tokens."""
+        epoch = self._epoch(self.clock() if now is None else now)
+        get = self._tokens.get
+        out = []
+        for token in tokens:
+            win = get(token)
+            if win is None:
+                out.append(0)
+            else:
+                win.advance(epoch)
+                out.append(win.total)
+        return out
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop tokens not incremented for *ttl* seconds; returns how many."""
+        cutoff = (self.clock() if now is None else now) - self.ttl
+        evicted = 0
+        while self._tokens:
+            token, win = next(iter(self._tokens.items()))
+            if win.touched > cutoff:
+                break
+            del self._tokens[token]
+            evicted += 1
+        return evicted
+
+    # ------------------------------------------------------------------ #
+    #  risk_alert integration                                            #
+    # ------------------------------------------------------------------ #
+
+    def risk_alert(
+        self,
+        token: str,
+        tx_density: float,
+        token_age_days: int,
+        cfg: RiskParams = RiskParams(),
+        now: Optional[float] = None,
+        record: Sequence[RiskRating] = (),
+    ) -> RiskRating:
+        """
+        ``risk_alert`` with ``recent_alerts`` taken from the store.
+
+        By default nothing is counted: callers ``increment`` when they actually
+        raise an alert.  With *record*, a token moving *into* one of those
+        ratings counts as one new alert; staying there on later evaluations
+        does not, so the count does not depend on how often tokens are polled.
+        """
+        now = self.clock() if now is None else now
+        win = self._tokens.get(token)
+        rating = risk_alert(tx_density, token_age_days, self.count(token, now), cfg)
+        previous = win.rating if win is not None else None
+        if rating in record and previous not in record:
+            self.increment(token, now=now)
+            win = self._tokens[token]
+        if win is not None:
+            win.rating = rating
+            win.touched = now
+            self._tokens.move_to_end(token)
+        return rating
+
+    def risk_alert_many(
+        self,
+        rows: Iterable[Tuple[str, float, int]],
+        cfg: RiskParams = RiskParams(),
+        now: Optional[float] = None,
+        record: Sequence[RiskRating] = (),
+    ) -> List[RiskRating]:
+        """Evaluate (token, tx_density, token_age_days) rows against one clock reading."""
+        now = self.clock() if now is None else now
+        return [self.risk_alert(token, density, age, cfg, now, record) for token, density, age in rows]
+
+
+if __name__ == "__main__":
+    import random
+    from time import perf_counter
+
+    store = AlertCounterStore(window=600, buckets=10)
+    t = 1_700_000_000.0
+    # density spikes twice, with a quiet spell in between; only entries into
+    # WATCHLIST / IMMEDIATE count, however often the token is polled
+    record = (RiskRating.WATCHLIST, RiskRating.IMMEDIATE)
+    for step, density in enumerate((420, 420, 420, 90, 90, 420, 420, 420)):
+        now = t + step * 30
+        rating = store.risk_alert("XYZ", tx_density=density, token_age_days=2, now=now, record=record)
+        print(f"t+{step * 30:>3}s  density={density:>3}  recent={store.count('XYZ', now)}  {rating.value}")
+    print("after window:", store.count("XYZ", t + 1200))
+
+    tokens = [f"T{i}" for i in range(100_000)]
+    for tok in random.sample(tokens, 20_000):
+        store.increment(tok, now=t)
+    t0 = perf_counter()
+    counts = store.counts(tokens, now=t + 60)
+    print(f"bulk query of {len(tokens):,} tokens: {(perf_counter() - t0) * 1000:.1f} ms, nonzero={sum(map(bool, counts)):,}")
@@ -2,7 +2,9 @@
 from dataclasses import dataclass
 from enum import Enum, auto
 from time import time
-from typing import List
+from typing import List, Sequence
+
+import numpy as np
 
 
 class FlowStatus(Enum):
@@ -61,5 +63,36 @@ def risk_alert(
     return RiskRating.STABLE
 
 
+# risk_alert() outcomes indexed by the codes risk_alert_codes() returns
+RISK_RATINGS = (RiskRating.STABLE, RiskRating.WATCHLIST, RiskRating.IMMEDIATE)
+
+
+def risk_alert_codes(
+    tx_density: np.ndarray,
+    token_age_days: np.ndarray,
+    recent_alerts: np.ndarray,
+    cfg: RiskParams = RiskParams(),
+) -> np.ndarray:
+    """
+    Vectorized risk_alert(): index into RISK_RATINGS per row.
+    """
+    immediate = (
+        (tx_density > cfg.density_critical)
+        & (token_age_days < cfg.token_age_limit)
+        & (recent_alerts >= cfg.alert_threshold)
+    )
+    return np.where(immediate, 2, np.where(tx_density > cfg.density_watchlist, 1, 0))
+
+
+def risk_alert_batch(
+    rows: Sequence[tuple], cfg: RiskParams = RiskParams()
+) -> List[RiskRating]:
+    """risk_alert() for each (tx_density, token_age_days, recent_alerts) row, computed column-wise."""
+    if not rows:
+        return []
+    d, age, n = np.array(rows, dtype=float).reshape(len(rows), 3).T
+    return [RISK_RATINGS[i] for i in risk_alert_codes(d, age, n, cfg).tolist()]
+
+
 def log_trace(event: str, meta: str) -> None:
     print(f"[TRACE] {event} — {meta} @ {int(time())}")
@@ -1,6 +1,22 @@
 
 from typing import List, Dict
 
+UNKNOWN_WALLET = "unknown_wallet"
+
+
+def is_proxy(address: str, marker: str = "proxy_") -> bool:
+    """
+    True if *address* is a proxy placeholder.
+
+    Args:
+        address: wallet address
+        marker:  prefix indicating a proxy placeholder
+
+    Returns:
+        True for proxy-prefixed wallets and already-resolved "unknown_wallet"
+    """
+    return address == UNKNOWN_WALLET or address.startswith(marker)
+
 
 def resolve_proxies(chain: List[str], marker: str = "proxy_") -> List[str]:
     """
@@ -13,7 +29,7 @@ def resolve_proxies(chain: List[str], marker: str = "proxy_") -> List[str]:
     Returns:
         list with proxies substituted by "unknown_wallet"
     """
-    return ["unknown_wallet" if w.startswith(marker) else w for w in chain]
+    return [UNKNOWN_WALLET if is_proxy(w, marker) else w for w in chain]
 
 
 def map_trace_resolution(traces: List[List[str]]) -> List[List[str]]:
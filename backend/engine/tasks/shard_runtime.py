@@ -0,0 +1,469 @@
+"""
+Multi-process, token-sharded worker runtime for continuous scoring.
+
+Tokens are assigned to one of N worker processes by ``crc32(token) % N``.
+Every worker owns the detector state of its tokens (``AnomalyScanner`` and a
+``StreamWatch`` window per token, plus the last ``aggregate_signal`` level)
+and receives its input through a single-producer / single-consumer ring
+buffer in shared memory.  Workers only report *changes* of a token's state
+back to the aggregator, through one shared result queue.
+
+A record that makes a detector raise is reported as an ``"error"`` result
+for its token instead of killing the worker.  The aggregator never blocks on
+a dead worker: waits time out periodically, and ``WorkerDied`` is raised
+(after tearing the remaining workers down) if a worker process has exited.
+
+``resize(n)`` rebalances gracefully: every worker drains its ring, ships its
+per-token state back and exits; the state is re-sharded for the new worker
+count and handed to the new processes on start-up.
+
+Ring ordering relies on the producer writing records before publishing the
+new tail, and the consumer reading them before publishing the new head.
+Python issues no memory barriers, so this is only sound where the hardware
+keeps stores in order (aligned 8-byte stores, x86-64 TSO); ``ShmRing``
+refuses to start on other machines.
+
+    python -m backend.engine.tasks.shard_runtime [ticks_per_token] [tokens]   # scaling benchmark
+"""
+import multiprocessing as mp
+import os
+import platform
+import struct
+import time
+import zlib
+from dataclasses import dataclass, fields
+from multiprocessing import shared_memory
+from queue import Empty
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from backend.logic.analysis_engine import AnomalyScanner
+from backend.services.dreamweaver import (
+    MarketData,
+    SignalLevel,
+    Thresholds,
+    liquidity_flow_ex,
+    pulse_track_ex,
+    trend_shift_ex,
+)
+from monitoring._telemetry import StreamWatch, detect_outliers
+
+# record kinds
+TICK = 0
+MARKET = 1
+BARRIER = 2
+SNAPSHOT = 3
+
+RECORD = struct.Struct("<IId8d")      # token_id, kind, ts, payload[8]
+_INDEX = struct.Struct("<Q")
+_HEAD_OFF, _TAIL_OFF, _HEADER = 0, 64, 128   # head / tail on separate cache lines
+_PAD7 = (0.0,) * 7
+_MARKET_FIELDS = tuple(f.name for f in fields(MarketData))
+_SEVERITY = {SignalLevel.ALERT: 2, SignalLevel.NOTICE: 1, SignalLevel.STABLE: 0}
+_TSO_MACHINES = {"x86_64", "amd64"}
+
+
+def shard_of(token: str, n_workers: int) -> int:
+    """Stable shard assignment (independent of PYTHONHASHSEED)."""
+    return zlib.crc32(token.encode()) % n_workers
+
+
+# ---------------------------------------------------------------------------
+# Shared-memory ring buffer
+# ---------------------------------------------------------------------------
+
+class ShmRing:
+    """SPSC ring of fixed-size ``RECORD`` slots in a SharedMemory block."""
+
+    def __init__(self, capacity: int, name: Optional[str] = None) -> None:
+        machine = platform.machine().lower()
+        if machine not in _TSO_MACHINES:
+            raise RuntimeError(f"ShmRing needs x86-64 store ordering; not supported on {machine or 'unknown'}")
+        self.capacity = capacity
+        size = _HEADER + capacity * RECORD.size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.shm.buf[:_HEADER] = bytes(_HEADER)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+
+    def _get(self, off: int) -> int:
+        return _INDEX.unpack_from(self.buf, off)[0]
+
+    def push_many(self, records: List[tuple]) -> int:
+        """Write as many records as fit; returns how many were written."""
+        head, tail = self._get(_HEAD_OFF), self._get(_TAIL_OFF)
+        n = min(self.capacity - (tail - head), len(records))
+        buf, cap, size, pack = self.buf, self.capacity, RECORD.size, RECORD.pack_into
+        for i in range(n):
+            pack(buf, _HEADER + ((tail + i) % cap) * size, *records[i])
+        _INDEX.pack_into(buf, _TAIL_OFF, tail + n)   # publish after the data
+        return n
+
+    def pop_many(self, max_n: int) -> List[tuple]:
+        head, tail = self._get(_HEAD_OFF), self._get(_TAIL_OFF)
+        n = min(tail - head, max_n)
+        buf, cap, size, unpack = self.buf, self.capacity, RECORD.size, RECORD.unpack_from
+        out = [unpack(buf, _HEADER + ((head + i) % cap) * size) for i in range(n)]
+        _INDEX.pack_into(buf, _HEAD_OFF, head + n)
+        return out
+
+    def close(self) -> None:
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    window_size: int = 50              # AnomalyScanner window
+    watch_window: int = 300            # StreamWatch window
+    watch_check_every: int = 50        # StreamWatch check cadence (ticks per token)
+    thresholds: Thresholds = Thresholds()
+    ring_capacity: int = 1 << 16
+
+
+class Result(NamedTuple):
+    token: str
+    detector: str     # "scanner" | "watch" | "signal" | "error"
+    state: str        # for "error": "<record kind>: <exception>"
+
+
+class WorkerDied(RuntimeError):
+    """A shard worker process exited unexpectedly."""
+
+
+_KIND_NAMES = {TICK: "tick", MARKET: "market"}
+
+
+TokenState = Dict[str, object]
+
+
+def _aggregate_level(data: MarketData, thr: Thresholds) -> SignalLevel:
+    results = (pulse_track_ex(data, thr), trend_shift_ex(data, thr), liquidity_flow_ex(data, thr))
+    return max((r[0] for r in results), key=_SEVERITY.__getitem__)
+
+
+def _worker_main(shard: int, ring_name: str, capacity: int, results, cfg: WorkerConfig,
+                 state: Dict[int, TokenState]) -> None:
+    ring = ShmRing(capacity, name=ring_name)
+    scanners: Dict[int, AnomalyScanner] = {}
+    watches: Dict[int, StreamWatch] = {}
+    last: Dict[Tuple[int, str], str] = {}
+    seen: Dict[int, int] = {}
+
+    for tid, st in state.items():
+        if st["scanner"] is not None:          # None: token only had MARKET records
+            scanners[tid] = AnomalyScanner(window_size=cfg.window_size)
+            scanners[tid].buffer.extend(st["scanner"])
+            watches[tid] = StreamWatch(window_size=cfg.watch_window)
+            watches[tid].window.extend(st["watch"])
+            seen[tid] = st["seen"]
+        last.update({(tid, det): val for det, val in st["last"].items()})
+
+    def emit(out: list, tid: int, det: str, value: str) -> None:
+        if last.get((tid, det)) != value:
+            last[(tid, det)] = value
+            out.append((tid, det, value))
+
+    backoff = 0.0001
+    while True:
+        recs = ring.pop_many(4096)
+        if not recs:
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 0.005)
+            continue
+        backoff = 0.0001
+        out: list = []
+        for rec in recs:
+            tid, kind = rec[0], rec[1]
+            if kind == BARRIER:
+                out.append((shard, "barrier", time.process_time()))
+            elif kind == SNAPSHOT:
+                if out:
+                    results.put(("results", shard, out))
+                snapshot: Dict[int, TokenState] = {
+                    tid: {"scanner": None, "watch": None, "seen": 0, "last": {}}
+                    for tid in set(scanners).union(t for t, _det in last)
+                }
+                for tid in scanners:
+                    snapshot[tid].update(scanner=list(scanners[tid].buffer),
+                                         watch=list(watches[tid].window), seen=seen[tid])
+                for (tid, det), val in last.items():
+                    snapshot[tid]["last"][det] = val
+                results.put(("snapshot", shard, snapshot))
+                ring.close()
+                return
+            else:
+                try:
+                    if kind == TICK:
+                        scanner = scanners.get(tid)
+                        if scanner is None:
+                            scanner = scanners[tid] = AnomalyScanner(window_size=cfg.window_size)
+                            watches[tid] = StreamWatch(window_size=cfg.watch_window)
+                            seen[tid] = 0
+                        scanner.add_value(rec[3])
+                        emit(out, tid, "scanner", scanner.state())
+                        # append directly: StreamWatch.add_event logs every datapoint
+                        window = watches[tid].window
+                        window.append(rec[3])
+                        seen[tid] += 1
+                        if seen[tid] % cfg.watch_check_every == 0:
+                            emit(out, tid, "watch", "anomalous" if detect_outliers(list(window)) else "stable")
+                    elif kind == MARKET:
+                        data = MarketData(**dict(zip(_MARKET_FIELDS, rec[3:])))
+                        emit(out, tid, "signal", _aggregate_level(data, cfg.thresholds).name.lower())
+                except Exception as exc:
+                    # report and keep serving the shard; one bad record must not stall it
+                    out.append((tid, "error", f"{_KIND_NAMES.get(kind, kind)}: {type(exc).__name__}: {exc}"))
+        if out:
+            results.put(("results", shard, out))
+
+
+# ---------------------------------------------------------------------------
+# Aggregator side
+# ---------------------------------------------------------------------------
+
+class ShardedRuntime:
+    """
+    Fans ticks out to N worker processes and gathers their state changes.
+
+    • ``submit_tick`` / ``submit_market`` buffer records per shard
+    • ``flush`` pushes buffered records into the shared-memory rings
+    • ``poll`` returns state changes reported so far
+    • ``drain`` waits until every submitted record has been processed
+    • ``resize`` rebalances token state onto a new number of workers
+    """
+
+    def __init__(self, n_workers: int = os.cpu_count() or 1, cfg: WorkerConfig = WorkerConfig(),
+                 batch: int = 512, poll_timeout: float = 0.5) -> None:
+        self.cfg = cfg
+        self.batch = batch
+        self.poll_timeout = poll_timeout
+        self.n_workers = 0
+        self._ctx = mp.get_context()
+        self._results = self._ctx.Queue()
+        self._token_ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+        self._rings: List[ShmRing] = []
+        self._procs: List[mp.Process] = []
+        self._pending: List[List[tuple]] = []
+        self._ready: List[Result] = []
+        self._barrier_acks: Set[int] = set()
+        self.worker_cpu: Dict[int, float] = {}     # shard -> CPU seconds at its last barrier
+        self._start(n_workers, {})
+
+    # ----------------------------- lifecycle ----------------------------- #
+
+    def _start(self, n_workers: int, state: Dict[int, TokenState]) -> None:
+        parts: List[Dict[int, TokenState]] = [{} for _ in range(n_workers)]
+        for tid, st in state.items():
+            parts[shard_of(self._tokens[tid], n_workers)][tid] = st
+        self.n_workers = n_workers
+        self._rings = [ShmRing(self.cfg.ring_capacity) for _ in range(n_workers)]
+        self._pending = [[] for _ in range(n_workers)]
+        self._procs = [
+            self._ctx.Process(
+                target=_worker_main,
+                args=(i, ring.name, ring.capacity, self._results, self.cfg, parts[i]),
+                daemon=True,
+            )
+            for i, ring in enumerate(self._rings)
+        ]
+        for proc in self._procs:
+            proc.start()
+
+    def _shutdown(self) -> Dict[int, TokenState]:
+        """Stop all workers after they drain their rings; returns their merged state."""
+        self._broadcast(SNAPSHOT)
+        state: Dict[int, TokenState] = {}
+        waiting = set(range(self.n_workers))
+        while waiting:
+            msg = self._next_result(waiting)
+            if msg[0] == "snapshot":
+                state.update(msg[2])
+                waiting.discard(msg[1])
+            else:
+                self._collect(msg)
+        for proc in self._procs:
+            proc.join()
+        self._release_rings()
+        return state
+
+    def _release_rings(self) -> None:
+        for ring in self._rings:
+            ring.close()
+            ring.unlink()
+        self._procs, self._rings = [], []
+
+    def _abort(self) -> None:
+        """Terminate all workers and free the rings (after a worker died)."""
+        for proc in self._procs:
+            if proc.is_alive():
+                proc.terminate()
+        for proc in self._procs:
+            proc.join()
+        self._release_rings()
+
+    def _check_alive(self, shards: Iterable[int]) -> None:
+        dead = [(i, self._procs[i].exitcode) for i in shards if not self._procs[i].is_alive()]
+        if dead:
+            self._collect_available()       # keep whatever the workers sent before exiting
+            self._abort()
+            detail = ", ".join(f"shard {i} (exit code {code})" for i, code in dead)
+            raise WorkerDied(f"worker process died: {detail}")
+
+    def _next_result(self, shards: Set[int]) -> tuple:
+        """Next message from the result queue; raises WorkerDied if one of *shards* has exited."""
+        while True:
+            try:
+                return self._results.get(timeout=self.poll_timeout)
+            except Empty:
+                self._check_alive(shards)
+
+    def resize(self, n_workers: int) -> None:
+        self._start(n_workers, self._shutdown())
+
+    def stop(self) -> None:
+        if self._procs:
+            self._shutdown()
+
+    # ------------------------------ input -------------------------------- #
+
+    def _token_id(self, token: str) -> int:
+        tid = self._token_ids.get(token)
+        if tid is None:
+            tid = self._token_ids[token] = len(self._tokens)
+            self._tokens.append(token)
+        return tid
+
+    def _enqueue(self, token: str, rec: tuple) -> None:
+        shard = shard_of(token, self.n_workers)
+        pending = self._pending[shard]
+        pending.append(rec)
+        if len(pending) >= self.batch:
+            self._push(shard)
+
+    def submit_tick(self, token: str, ts: float, value: float) -> None:
+        self._enqueue(token, (self._token_id(token), TICK, ts, value) + _PAD7)
+
+    def submit_market(self, token: str, ts: float, data: MarketData) -> None:
+        payload = tuple(float(getattr(data, name)) for name in _MARKET_FIELDS)
+        self._enqueue(token, (self._token_id(token), MARKET, ts) + payload)
+
+    def _push(self, shard: int) -> None:
+        pending, ring = self._pending[shard], self._rings[shard]
+        while pending:
+            n = ring.push_many(pending)
+            del pending[:n]
+            if pending:
+                self._collect_available()   # ring full: keep the result queue moving
+                self._check_alive((shard,))
+                time.sleep(0.0001)
+
+    def flush(self) -> None:
+        for shard in range(self.n_workers):
+            self._push(shard)
+
+    def _broadcast(self, kind: int) -> None:
+        self.flush()
+        for shard in range(self.n_workers):
+            self._pending[shard].append((0, kind, 0.0) + (0.0,) * 8)
+            self._push(shard)
+
+    # ------------------------------ output ------------------------------- #
+
+    def _collect(self, msg: tuple) -> None:
+        if msg[0] != "results":
+            return
+        tokens = self._tokens
+        for tid, det, value in msg[2]:
+            if det == "barrier":             # tid is the shard, value its CPU time
+                self._barrier_acks.add(tid)
+                self.worker_cpu[tid] = value
+            else:
+                self._ready.append(Result(tokens[tid], det, value))
+
+    def _collect_available(self) -> None:
+        while True:
+            try:
+                self._collect(self._results.get_nowait())
+            except Empty:
+                return
+
+    def poll(self) -> List[Result]:
+        self._collect_available()
+        ready, self._ready = self._ready, []
+        return ready
+
+    def drain(self) -> None:
+        """Block until every worker has processed everything submitted so far."""
+        self._barrier_acks = set()
+        self._broadcast(BARRIER)
+        shards = set(range(self.n_workers))
+        while self._barrier_acks != shards:
+            self._collect(self._next_result(shards - self._barrier_acks))
+
+
+# ----------------------------- Benchmark ----------------------------- #
+if __name__ == "__main__":
+    import random
+    import sys
+
+    # enough ticks per token to fill the scanner (50) and watch (300) windows,
+    # so every tick is really scored, plus one MarketData record per 10 ticks
+    per_token = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    n_tokens = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    n_ticks = n_tokens * per_token
+    rng = random.Random(7)
+    records = []
+    for i in range(n_ticks):
+        token = f"token{i % n_tokens}"
+        records.append((token, rng.gauss(100, 3), None))
+        if i % 10 == 0:
+            records.append((token, 0.0, MarketData(
+                rng.uniform(1e3, 1e6), rng.randint(1, 500), rng.uniform(-0.2, 0.2), 1.0, 1000.0,
+                rng.uniform(0.9, 1.1), rng.uniform(0, 1e4), rng.uniform(1e3, 1e5))))
+    n_market = sum(1 for r in records if r[2] is not None)
+    cores = os.cpu_count() or 1
+    print(f"{n_tokens} tokens x {per_token} ticks = {n_ticks:,} ticks + {n_market:,} market records, cores={cores}")
+
+    base = None
+    for n in sorted({1, 2, 4, cores} | set(range(2, cores + 1, 2))):
+        runtime = ShardedRuntime(n_workers=n)
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        for i, (token, value, market) in enumerate(records):
+            if market is None:
+                runtime.submit_tick(token, float(i), value)
+            else:
+                runtime.submit_market(token, float(i), market)
+        producer_cpu = time.process_time() - cpu0
+        runtime.drain()
+        elapsed = time.perf_counter() - t0
+        changes = runtime.poll()
+        worker_cpu = [runtime.worker_cpu[i] for i in range(n)]
+        runtime.stop()
+        base = base or elapsed
+        kinds = {det: sum(1 for r in changes if r.detector == det) for det in ("scanner", "watch", "signal", "error")}
+        print(f"workers={n:2d} {len(records) / elapsed:>8,.0f} rec/s  speedup={base / elapsed:4.2f}x  "
+              f"producer={len(records) / producer_cpu:>9,.0f} rec/s CPU  "
+              f"worker CPU={'/'.join(f'{c:.1f}' for c in worker_cpu)}s  changes={kinds}")
+
+    # graceful rebalancing keeps per-token state; bad records are reported, not fatal
+    runtime = ShardedRuntime(n_workers=2)
+    for i in range(120):
+        runtime.submit_tick("demo", float(i), 100.0 + (i % 5))
+    runtime.resize(3)
+    runtime.submit_tick("demo", 120.0, 400.0)
+    runtime.submit_market("demo", 121.0, MarketData(1.0, float("nan"), 0.1, 1.0, 1.0, 1.0, 1.0, 1.0))
+    runtime.drain()
+    print("after resize:", [r for r in runtime.poll() if r.token == "demo"][-2:])
+    runtime.stop()
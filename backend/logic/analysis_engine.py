@@ -1,7 +1,7 @@
 
 from collections import deque
 from statistics import mean, stdev
-from typing import Deque, List, Union, Tuple
+from typing import Any, Deque, Iterable, List, Optional, Union, Tuple
 
 
 class TrendState:
@@ -17,6 +17,8 @@ class AnomalyScanner:
     • Keeps a fixed-length buffer of the most recent values
     • Computes z-score and mean-absolute deviation (MAD)
     • Emits `volatile` if deviation exceeds configurable threshold
+    • Optionally feeds a rollup (e.g. RollupPyramid) for long-horizon
+      baselines, queried through `baseline_z`
     """
 
     def __init__(
@@ -24,19 +26,33 @@ class AnomalyScanner:
         window_size: int = 50,
         z_threshold: float = 3.0,
         mad_threshold: float = 0.25,
+        rollup: Optional[Any] = None,
     ) -> None:
         self.window_size = window_size
         self.z_threshold = z_threshold
         self.mad_threshold = mad_threshold
         self.buffer: Deque[float] = deque(maxlen=window_size)
+        self.rollup = rollup
 
     # ------------------------------------------------------------------ #
     #  Public interface                                                  #
     # ------------------------------------------------------------------ #
 
-    def add_value(self, value: float) -> None:
-        """Append a new observation."""
+    def add_value(self, value: float, ts: Optional[float] = None) -> None:
+        """Append a new observation (*ts* is only used by the rollup)."""
         self.buffer.append(value)
+        if self.rollup is not None:
+            self.rollup.add(value, ts)
+
+    def warm(self, values: Iterable[float], ts: Optional[Iterable[float]] = None) -> None:
+        """
+        Bulk-load historical observations (oldest first), e.g. after a restart.
+        With timestamps *ts* the values are also replayed into the rollup.
+        """
+        values = [float(v) for v in values]
+        self.buffer.extend(values)
+        if self.rollup is not None and ts is not None:
+            self.rollup.add_many(zip(ts, values))
 
     def state(self) -> str:
         """Return current market state."""
@@ -57,6 +73,23 @@ class AnomalyScanner:
         deviation_score = max(z_max / self.z_threshold, mad_ratio / self.mad_threshold)
         return self.state(), deviation_score
 
+    def baseline_z(self, value: Optional[float] = None, level: int = -1,
+                   now: Optional[float] = None) -> float:
+        """
+        z-score of *value* (default: latest observation) against the rollup
+        level's long baseline as of *now* (default: the rollup's clock), so
+        buckets that expired during an idle stretch are not counted; 0.0
+        without a rollup or data.
+        """
+        if self.rollup is None:
+            return 0.0
+        if value is None:
+            if not self.buffer:
+                return 0.0
+            value = self.buffer[-1]
+        self.rollup.advance(now)
+        return self.rollup.zscore(value, level)
+
     # ------------------------------------------------------------------ #
     #  Internal helpers                                                  #
     # ------------------------------------------------------------------ #
@@ -0,0 +1,207 @@
+from array import array
+from dataclasses import dataclass
+from math import inf, sqrt
+import time
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+# (slot width in seconds, number of slots): 1 min of seconds, 1 h of minutes, 24 h of hours
+DEFAULT_LEVELS: Tuple[Tuple[int, int], ...] = ((1, 60), (60, 60), (3600, 24))
+
+
+@dataclass(frozen=True)
+class RollupStats:
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+
+
+class _Level:
+    """Ring of fixed-width time buckets with running totals over the whole ring."""
+
+    __slots__ = ("width", "slots", "count", "total", "sumsq", "mn", "mx", "head", "n", "s", "ss")
+
+    def __init__(self, width: int, slots: int) -> None:
+        self.width = width
+        self.slots = slots
+        self.count = array("q", [0] * slots)
+        self.total = array("d", [0.0] * slots)
+        self.sumsq = array("d", [0.0] * slots)
+        self.mn = array("d", [inf] * slots)
+        self.mx = array("d", [-inf] * slots)
+        self.head = -1              # newest bucket epoch seen
+        self.n = 0                  # running totals over live buckets
+        self.s = 0.0
+        self.ss = 0.0
+
+    def advance(self, epoch: int) -> None:
+        """Expire buckets that fall out of the ring when time reaches *epoch*."""
+        if epoch <= self.head:
+            return
+        start = max(self.head + 1, epoch - self.slots + 1)
+        for e in range(start, epoch + 1):
+            i = e % self.slots
+            if self.count[i]:
+                self.n -= self.count[i]
+                self.s -= self.total[i]
+                self.ss -= self.sumsq[i]
+                self.count[i] = 0
+                self.total[i] = self.sumsq[i] = 0.0
+                self.mn[i], self.mx[i] = inf, -inf
+        self.head = epoch
+        if not self.n:              # drop accumulated rounding once the ring is empty
+            self.s = self.ss = 0.0
+
+    def add(self, x: float, epoch: int) -> bool:
+        self.advance(epoch)
+        if epoch <= self.head - self.slots:
+            return False            # older than the ring covers
+        i = epoch % self.slots
+        self.count[i] += 1
+        self.total[i] += x
+        self.sumsq[i] += x * x
+        if x < self.mn[i]:
+            self.mn[i] = x
+        if x > self.mx[i]:
+            self.mx[i] = x
+        self.n += 1
+        self.s += x
+        self.ss += x * x
+        return True
+
+    def moments(self) -> Tuple[int, float, float]:
+        n = self.n
+        if n == 0:
+            return 0, 0.0, 0.0
+        mu = self.s / n
+        var = (self.ss - n * mu * mu) / (n - 1) if n > 1 else 0.0
+        return n, mu, sqrt(var) if var > 0 else 0.0
+
+
+class RollupPyramid:
+    """
+    Multi-resolution rollup of one value stream.
+
+    • each level is a ring of ``slots`` buckets of ``width`` seconds holding
+      count / sum / sum of squares / min / max
+    • running count, sum and sum of squares per level are kept up to date by
+      subtracting buckets as they expire, so mean / std / z-score against a
+      level cost O(1) and against all levels O(levels)
+    • memory is fixed by the level layout, independent of the event rate
+
+    Values are stored relative to the first observation so sum-of-squares
+    variance stays accurate for large, slowly moving series (prices, volumes).
+    """
+
+    def __init__(
+        self,
+        levels: Sequence[Tuple[int, int]] = DEFAULT_LEVELS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not levels:
+            raise ValueError("at least one (width, slots) level is required")
+        self.levels: List[_Level] = [_Level(int(w), int(n)) for w, n in levels]
+        self.clock = clock
+        self._ref: Optional[float] = None
+
+    # --------------------------- Ingest --------------------------- #
+
+    def add(self, value: float, ts: Optional[float] = None) -> None:
+        """Record *value* at *ts* (seconds; defaults to ``clock()``)."""
+        x = float(value)
+        if self._ref is None:
+            self._ref = x
+        x -= self._ref
+        t = self.clock() if ts is None else ts
+        for lvl in self.levels:
+            lvl.add(x, int(t // lvl.width))
+
+    def add_many(self, items: Iterable[Tuple[float, float]]) -> None:
+        """Record ``(ts, value)`` pairs, e.g. replayed from a SeriesStore."""
+        for ts, value in items:
+            self.add(value, ts)
+
+    def advance(self, now: Optional[float] = None) -> None:
+        """Expire buckets up to *now* without adding data."""
+        t = self.clock() if now is None else now
+        for lvl in self.levels:
+            lvl.advance(int(t // lvl.width))
+
+    # --------------------------- Queries -------------------------- #
+
+    def span(self, level: int = -1) -> int:
+        """Seconds covered by *level*."""
+        lvl = self.levels[level]
+        return lvl.width * lvl.slots
+
+    @property
+    def horizon(self) -> int:
+        """Seconds covered by the longest level (how much history is worth replaying)."""
+        return max(lvl.width * lvl.slots for lvl in self.levels)
+
+    def stats(self, level: int = -1, now: Optional[float] = None) -> RollupStats:
+        lvl = self.levels[level]
+        if now is not None:
+            lvl.advance(int(now // lvl.width))
+        n, mu, sigma = lvl.moments()
+        if n == 0:
+            return RollupStats(0, 0.0, 0.0, 0.0, 0.0)
+        ref = self._ref or 0.0
+        live = [i for i in range(lvl.slots) if lvl.count[i]]
+        return RollupStats(
+            count=n,
+            mean=mu + ref,
+            std=sigma,
+            min=min(lvl.mn[i] for i in live) + ref,
+            max=max(lvl.mx[i] for i in live) + ref,
+        )
+
+    def zscore(self, value: float, level: int = -1, now: Optional[float] = None) -> float:
+        """z-score of *value* against the baseline held by *level* (0.0 without spread)."""
+        lvl = self.levels[level]
+        if now is not None:
+            lvl.advance(int(now // lvl.width))
+        n, mu, sigma = lvl.moments()
+        if n < 2 or not sigma:
+            return 0.0
+        return (float(value) - (self._ref or 0.0) - mu) / sigma
+
+    def zscores(self, value: float, now: Optional[float] = None) -> List[float]:
+        """z-score of *value* against every level, finest first."""
+        return [self.zscore(value, i, now) for i in range(len(self.levels))]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(lvl.slots for lvl in self.levels) * 5 * 8    # count/total/sumsq/mn/mx
+
+
+# ----------------------------- Quick demo ----------------------------- #
+if __name__ == "__main__":
+    import random
+    from statistics import mean, stdev
+
+    t0 = 1_700_000_000.0
+    pyramid = RollupPyramid()
+    raw: List[Tuple[float, float]] = []
+    ts = t0
+    for i in range(200_000):                      # ~2 ticks/s for ~28 h
+        ts += random.expovariate(2.0)
+        v = 100.0 + 5.0 * random.gauss(0, 1) + (i / 20_000)
+        pyramid.add(v, ts)
+        raw.append((ts, v))
+
+    spike = 140.0
+    print(f"pyramid memory: {pyramid.nbytes:,} bytes (raw 24 h would be {sum(1 for t, _ in raw if t > ts - 86400) * 8:,})")
+    for level, (width, slots) in enumerate(DEFAULT_LEVELS):
+        lvl = pyramid.levels[level]
+        lo = (int(ts // width) - slots + 1) * width    # buckets are aligned to the width
+        window = [v for t, v in raw if t >= lo]
+        exact = (spike - mean(window)) / stdev(window)
+        print(f"level {width:>4}s x {slots:<3} n={len(window):>7,}  z={pyramid.zscore(spike, level):7.3f}  exact={exact:7.3f}")
+
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        pyramid.zscores(spike)
+    print(f"zscores over {len(DEFAULT_LEVELS)} levels: {(time.perf_counter() - start) / n * 1e6:.2f} µs")
@@ -1,6 +1,6 @@
 from collections import deque
-from statistics import mean, stdev
-from typing import Deque, List
+from math import fsum, sqrt
+from typing import Deque, Iterable, List, Optional, Tuple
 
 
 def normalize_data(data: List[float]) -> List[float]:
@@ -16,30 +16,89 @@ def detect_signal_peaks(values: List[float], threshold: float = 0.85) -> List[in
 
 
 class SignalProcessor:
+    """
+    Rolling peak / z-score analyzer.
+
+    Window min and max are tracked incrementally with monotonic deques, and
+    the result of ``analyze()`` is cached until the next ``feed``.  Values
+    must go through ``feed`` / ``feed_many`` (not ``window.append``) so the
+    tracking stays consistent.
+    """
+
     def __init__(self, window: int = 50, peak_threshold: float = 0.85) -> None:
         self.window: Deque[float] = deque(maxlen=window)
         self.peak_threshold = peak_threshold
+        self._seq = 0
+        self._min_q: Deque[Tuple[int, float]] = deque()   # (seq, value), increasing values
+        self._max_q: Deque[Tuple[int, float]] = deque()   # (seq, value), decreasing values
+        self._cached: Optional[str] = None
 
     # --------------------------- Public API --------------------------- #
 
     def feed(self, val: float) -> None:
+        val = float(val)
         self.window.append(val)
+        seq = self._seq
+        self._seq = seq + 1
+        expired = seq - self.window.maxlen
+
+        min_q, max_q = self._min_q, self._max_q
+        while min_q and min_q[-1][1] >= val:
+            min_q.pop()
+        min_q.append((seq, val))
+        if min_q[0][0] <= expired:
+            min_q.popleft()
+        while max_q and max_q[-1][1] <= val:
+            max_q.pop()
+        max_q.append((seq, val))
+        if max_q[0][0] <= expired:
+            max_q.popleft()
+
+        self._cached = None
+
+    def feed_many(self, values: Iterable[float]) -> None:
+        """Feed a batch (list, array, ...); only the last ``window`` values matter."""
+        vals = values.tolist() if hasattr(values, "tolist") else list(values)
+        if len(vals) >= self.window.maxlen:
+            vals = vals[-self.window.maxlen:]
+            self.window.clear()
+            self._min_q.clear()
+            self._max_q.clear()
+        for v in vals:
+            self.feed(v)
+
+    def warm(self, values: Iterable[float]) -> None:
+        self.feed_many(values)
 
     def analyze(self) -> str:
+        if self._cached is None:
+            self._cached = self._analyze()
+        return self._cached
+
+    # ------------------------- Internal utils ------------------------ #
+
+    def _analyze(self) -> str:
         if len(self.window) < 10:
             return "Waiting for data…"
 
-        norm = normalize_data(list(self.window))
-        peaks = detect_signal_peaks(norm, self.peak_threshold)
+        peaks = self._peak_count()
         zscore = self._max_z_score()
 
         if peaks:
-            return f"{len(peaks)} spike(s) detected | max z={zscore:.2f}"
+            return f"{peaks} spike(s) detected | max z={zscore:.2f}"
         return f"No spikes | max z={zscore:.2f}"
 
-    # ------------------------- Internal utils ------------------------ #
+    def _peak_count(self) -> int:
+        # same test as detect_signal_peaks(normalize_data(window)), without the list
+        mn, mx = self._min_q[0][1], self._max_q[0][1]
+        rng = mx - mn or 1e-9
+        thr = self.peak_threshold
+        return sum(1 for x in self.window if (x - mn) / rng > thr)
 
     def _max_z_score(self) -> float:
-        vals = list(self.window)
-        μ, σ = mean(vals), stdev(vals) or 1e-9
-        return max(abs(x - μ) / σ for x in vals)
+        vals = self.window
+        n = len(vals)
+        μ = fsum(vals) / n
+        σ = sqrt(fsum((x - μ) ** 2 for x in vals) / (n - 1)) or 1e-9
+        # the largest |x - μ| is at the window minimum or maximum
+        return max(self._max_q[0][1] - μ, μ - self._min_q[0][1]) / σ
@@ -1,7 +1,10 @@
 # market_signals.py
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum, auto
-from typing import Dict, Tuple
+from operator import attrgetter
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
 
 
 class SignalLevel(Enum):
@@ -142,3 +145,74 @@ def aggregate_signal(data: MarketData, thr: Thresholds = Thresholds()) -> str:
     best = max(results, key=lambda r: severity[r[0]])
     return _signal_msg(best[0], best[1])
  
+
+
+# ---- Columnar form: aggregate_signal() over many rows in one pass ------------------------------
+
+MARKET_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(MarketData))
+_market_values = attrgetter(*MARKET_FIELDS)
+
+# every message aggregate_signal() can return, indexed by the codes below
+AGGREGATE_MESSAGES: Tuple[str, ...] = (
+    _signal_msg(SignalLevel.NOTICE, "no transactions observed"),       # 0  pulse
+    _signal_msg(SignalLevel.ALERT, "major market shift detected"),     # 1
+    _signal_msg(SignalLevel.STABLE, "market stable"),                  # 2
+    _signal_msg(SignalLevel.ALERT, "early trend shift identified"),    # 3  trend
+    _signal_msg(SignalLevel.STABLE, "trend stable"),                   # 4
+    _signal_msg(SignalLevel.ALERT, "zero market liquidity"),           # 5  liquidity
+    _signal_msg(SignalLevel.ALERT, "low liquidity detected"),          # 6
+    _signal_msg(SignalLevel.NOTICE, "liquidity somewhat thin"),        # 7
+    _signal_msg(SignalLevel.STABLE, "liquidity normal"),               # 8
+)
+
+
+def market_columns(items: Sequence[MarketData]) -> Dict[str, np.ndarray]:
+    """MarketData rows → one float64 column per field."""
+    table = np.array([_market_values(d) for d in items], dtype=float).reshape(len(items), len(MARKET_FIELDS))
+    return {name: table[:, i] for i, name in enumerate(MARKET_FIELDS)}
+
+
+def aggregate_signal_codes(
+    cols: Mapping[str, np.ndarray], thr: Thresholds = Thresholds()
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized aggregate_signal() over MarketData columns.
+    Returns (severity 0/1/2 = STABLE/NOTICE/ALERT, index into AGGREGATE_MESSAGES) per row.
+    """
+    # pulse
+    tf = np.maximum(0, np.trunc(cols["transaction_frequency"]))
+    no_tx = tf == 0
+    vol_index = np.maximum(cols["total_volume"] / np.where(no_tx, 1, tf), thr.min_volatility_index)
+    shift = np.clip(cols["price_change"], -1.0, 1.0) / vol_index
+    pulse_alert = ~no_tx & (np.abs(shift) > thr.shift_factor_alert)
+    pulse_sev = np.where(no_tx, 1, np.where(pulse_alert, 2, 0))
+    pulse_msg = np.where(no_tx, 0, np.where(pulse_alert, 1, 2))
+
+    # trend
+    prev_price = np.maximum(0.0, cols["previous_price"])
+    baseline = prev_price * np.maximum(0.0, cols["previous_volume"]) / 1000.0
+    baseline = np.where(baseline <= 0, np.where(prev_price != 0, prev_price, 1.0), baseline)
+    trend_alert = np.abs((cols["current_price"] - baseline) / baseline) > thr.trend_deviation_alert
+    trend_sev = np.where(trend_alert, 2, 0)
+    trend_msg = np.where(trend_alert, 3, 4)
+
+    # liquidity
+    liq = np.maximum(0.0, cols["market_liquidity"])
+    no_liq = liq == 0
+    ratio = np.maximum(0.0, cols["token_volume"]) / np.where(no_liq, 1.0, liq)
+    liq_sev = np.select([no_liq, ratio < thr.liq_alert_ratio, ratio < thr.liq_notice_ratio], [2, 2, 1], 0)
+    liq_msg = np.select([no_liq, ratio < thr.liq_alert_ratio, ratio < thr.liq_notice_ratio], [5, 6, 7], 8)
+
+    # highest severity wins, ties go to the earlier analyzer (as max() does)
+    sev = np.stack([pulse_sev, trend_sev, liq_sev])
+    best = np.argmax(sev, axis=0)
+    rows = np.arange(sev.shape[1])
+    return sev[best, rows], np.stack([pulse_msg, trend_msg, liq_msg])[best, rows]
+
+
+def aggregate_signal_batch(items: Sequence[MarketData], thr: Thresholds = Thresholds()) -> List[str]:
+    """aggregate_signal() for each item, computed column-wise."""
+    if not items:
+        return []
+    _sev, msg = aggregate_signal_codes(market_columns(items), thr)
+    return [AGGREGATE_MESSAGES[i] for i in msg.tolist()]
@@ -0,0 +1,108 @@
+"""
+Load benchmark for the scoring service.
+
+Starts the app in-process on a local port, drives it from concurrent
+keep-alive clients and reports throughput and latency percentiles for three
+batcher settings: unbatched (max_batch=1), greedy (take whatever is queued,
+max_wait=0) and windowed (max_wait=2 ms).  Each run also times the NDJSON
+bulk endpoint and the batch scoring function alone (no HTTP), which is where
+the column-wise signal path gains from larger batches.
+
+    python -m backend.services.scoring_bench [clients] [requests_per_client]
+"""
+import http.client
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from werkzeug.serving import make_server
+
+from backend.services.scoring_service import ScoringBackend, create_app
+
+SIGNAL = {
+    "total_volume": 12_500.0,
+    "transaction_frequency": 340,
+    "price_change": 0.04,
+    "previous_price": 1.02,
+    "previous_volume": 980.0,
+    "current_price": 1.07,
+    "token_volume": 410.0,
+    "market_liquidity": 5_200.0,
+}
+
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(round(pct / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+def _client(port: int, n: int, latencies: List[float]) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    body = json.dumps(SIGNAL)
+    headers = {"Content-Type": "application/json"}
+    for _ in range(n):
+        t0 = time.perf_counter()
+        conn.request("POST", "/score/signal", body, headers)
+        conn.getresponse().read()
+        latencies.append(time.perf_counter() - t0)
+    conn.close()
+
+
+def run_load(max_batch: int, clients: int, per_client: int, max_wait: float = 0.0) -> Dict[str, float]:
+    server = make_server("127.0.0.1", 0, create_app(max_batch=max_batch, max_wait=max_wait), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        latencies: List[float] = []
+        threads = [threading.Thread(target=_client, args=(server.port, per_client, latencies)) for _ in range(clients)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+
+        bulk_rows = 10_000
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        payload = "\n".join(json.dumps(SIGNAL) for _ in range(bulk_rows))
+        t1 = time.perf_counter()
+        conn.request("POST", "/bulk/signal", payload, {"Content-Type": "application/x-ndjson"})
+        conn.getresponse().read()
+        bulk_elapsed = time.perf_counter() - t1
+        conn.close()
+    finally:
+        server.shutdown()
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "bulk_rows_per_s": bulk_rows / bulk_elapsed,
+    }
+
+
+def score_cost(max_batch: int, rows: int = 20_000) -> float:
+    """Microseconds per item spent in the signal batch function at *max_batch*."""
+    backend = ScoringBackend()
+    fn = backend.batch_fn("signal")
+    items = [backend.parse("signal", SIGNAL)] * rows
+    t0 = time.perf_counter()
+    for start in range(0, rows, max_batch):
+        fn(items[start:start + max_batch])
+    return (time.perf_counter() - t0) / rows * 1e6
+
+
+if __name__ == "__main__":
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for label, max_batch, max_wait in (("unbatched", 1, 0.0), ("greedy", 64, 0.0), ("batched", 64, 0.002)):
+        stats = run_load(max_batch, clients, per_client, max_wait)
+        print(f"{label:9s} clients={clients} rps={stats['rps']:,.0f} p50={stats['p50_ms']:.2f}ms "
+              f"p99={stats['p99_ms']:.2f}ms bulk={stats['bulk_rows_per_s']:,.0f} rows/s "
+              f"scoring={score_cost(max_batch):.2f}µs/item")
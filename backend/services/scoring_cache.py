@@ -0,0 +1,354 @@
+"""
+Change-driven scoring cache for the market-signal and token-risk analyzers.
+
+Tokens are registered with ``update_market`` / ``update_snapshot``.  Each
+update is compared field by field with the previous inputs, and only the
+analyzers that read a changed field are marked dirty:
+
+    pulse       total_volume, transaction_frequency, price_change
+    trend       previous_price, previous_volume, current_price
+    liquidity   token_volume, market_liquidity
+    radar       current_price, previous_price              (TokenSnapshot)
+    volatility  all TokenSnapshot fields
+
+Changing thresholds through ``set_thresholds`` marks the analyzers that use
+them dirty for every token.  ``rescore()`` recomputes the dirty analyzers
+and returns a ``Transition`` for each analyzer whose level changed; tokens
+with unchanged inputs cost nothing.  ``signal(token)`` and ``risk(token)``
+return the same values as ``aggregate_signal`` / ``evaluate_token_risk``
+from the cached results.
+"""
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.security._security_scanner import TokenSnapshot, risk_radar, volatility_predict
+from backend.services.dreamweaver import (
+    MarketData,
+    SignalLevel,
+    Thresholds,
+    _signal_msg,
+    liquidity_flow_ex,
+    pulse_track_ex,
+    trend_shift_ex,
+)
+
+# analyzer bits
+PULSE, TREND, LIQUIDITY, RADAR, VOLATILITY = 1, 2, 4, 8, 16
+MARKET_ANALYZERS = PULSE | TREND | LIQUIDITY
+RISK_ANALYZERS = RADAR | VOLATILITY
+ANALYZER_NAMES = {PULSE: "pulse", TREND: "trend", LIQUIDITY: "liquidity", RADAR: "radar", VOLATILITY: "volatility"}
+
+MARKET_FIELDS = tuple(f.name for f in fields(MarketData))
+SNAPSHOT_FIELDS = tuple(f.name for f in fields(TokenSnapshot))
+
+_MARKET_DEPS = {
+    "total_volume": PULSE,
+    "transaction_frequency": PULSE,
+    "price_change": PULSE,
+    "previous_price": TREND,
+    "previous_volume": TREND,
+    "current_price": TREND,
+    "token_volume": LIQUIDITY,
+    "market_liquidity": LIQUIDITY,
+}
+_SNAPSHOT_DEPS = {
+    "current_price": RADAR | VOLATILITY,
+    "previous_price": RADAR | VOLATILITY,
+    "liquidity_factor": VOLATILITY,
+    "market_depth": VOLATILITY,
+}
+_THRESHOLD_DEPS = {
+    "shift_factor_alert": PULSE,
+    "min_volatility_index": PULSE,
+    "trend_deviation_alert": TREND,
+    "liq_alert_ratio": LIQUIDITY,
+    "liq_notice_ratio": LIQUIDITY,
+}
+
+_MARKET_MASKS = tuple(_MARKET_DEPS[name] for name in MARKET_FIELDS)
+_SNAPSHOT_MASKS = tuple(_SNAPSHOT_DEPS[name] for name in SNAPSHOT_FIELDS)
+_market_values = attrgetter(*MARKET_FIELDS)
+_snapshot_values = attrgetter(*SNAPSHOT_FIELDS)
+
+_SEVERITY = {SignalLevel.ALERT: 2, SignalLevel.NOTICE: 1, SignalLevel.STABLE: 0}
+
+Result = Tuple[SignalLevel, str, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class Transition:
+    token: str
+    analyzer: str                    # pulse | trend | liquidity | radar | volatility
+    old_level: Optional[SignalLevel]  # None the first time the analyzer is scored
+    new_level: SignalLevel
+    message: str
+
+
+class _Entry:
+    __slots__ = ("market", "snapshot", "results", "dirty")
+
+    def __init__(self) -> None:
+        self.market: Optional[tuple] = None
+        self.snapshot: Optional[tuple] = None
+        self.results: Dict[int, Result] = {}
+        self.dirty = 0
+
+
+def _diff_mask(old: Optional[tuple], new: tuple, masks: tuple, all_bits: int) -> int:
+    if old is None:
+        return all_bits
+    mask = 0
+    for a, b, bit in zip(old, new, masks):
+        if a != b:
+            mask |= bit
+    return mask
+
+
+def _risk_result(report: Dict[str, Any]) -> Result:
+    status = report["status"]
+    level = SignalLevel.ALERT if status.startswith("Alert") else SignalLevel.STABLE
+    return level, status, report
+
+
+class ScoringCache:
+    def __init__(
+        self,
+        thresholds: Thresholds = Thresholds(),
+        instability_threshold: float = 0.10,
+        volatility_threshold: float = 0.5,
+    ) -> None:
+        self.thresholds = thresholds
+        self.instability_threshold = instability_threshold
+        self.volatility_threshold = volatility_threshold
+        self._entries: Dict[str, _Entry] = {}
+        self._dirty: Set[str] = set()
+        self.recomputed = 0          # analyzer evaluations, for instrumentation
+
+    # --------------------------- Inputs --------------------------- #
+
+    def _mark(self, token: str, entry: _Entry, mask: int) -> None:
+        if mask:
+            entry.dirty |= mask
+            self._dirty.add(token)
+
+    def _update(
+        self, token: str, attr: str, values: Optional[tuple], changes: Dict[str, float],
+        names: Tuple[str, ...], masks: Tuple[int, ...], all_bits: int, kind: str,
+    ) -> int:
+        entry = self._entries.get(token)
+        previous = getattr(entry, attr) if entry is not None else None
+        if values is None:
+            if previous is None:
+                raise ValueError(f"no {kind} recorded for {token!r}; pass a full object first")
+            values = previous
+        if changes:
+            unknown = changes.keys() - set(names)
+            if unknown:
+                raise ValueError(f"unknown {kind} field(s): {', '.join(sorted(unknown))}")
+            values = tuple(changes.get(name, v) for name, v in zip(names, values))
+        if values == previous:
+            return 0
+        if entry is None:
+            entry = self._entries[token] = _Entry()
+        mask = _diff_mask(previous, values, masks, all_bits)
+        setattr(entry, attr, values)
+        self._mark(token, entry, mask)
+        return mask
+
+    def update_market(self, token: str, data: Optional[MarketData] = None, **changes: float) -> int:
+        """
+        Record new MarketData for *token* (a full object, keyword field
+        updates, or both).  Returns the mask of analyzers marked dirty.
+        """
+        values = _market_values(data) if data is not None else None
+        entry = self._entries.get(token)
+        if entry is not None and not changes and values is not None and values == entry.market:
+            return 0
+        return self._update(token, "market", values, changes,
+                            MARKET_FIELDS, _MARKET_MASKS, MARKET_ANALYZERS, "MarketData")
+
+    def update_snapshot(self, token: str, snapshot: Optional[TokenSnapshot] = None, **changes: float) -> int:
+        """TokenSnapshot counterpart of ``update_market``."""
+        values = _snapshot_values(snapshot) if snapshot is not None else None
+        entry = self._entries.get(token)
+        if entry is not None and not changes and values is not None and values == entry.snapshot:
+            return 0
+        return self._update(token, "snapshot", values, changes,
+                            SNAPSHOT_FIELDS, _SNAPSHOT_MASKS, RISK_ANALYZERS, "TokenSnapshot")
+
+    def set_thresholds(
+        self,
+        thresholds: Optional[Thresholds] = None,
+        instability_threshold: Optional[float] = None,
+        volatility_threshold: Optional[float] = None,
+    ) -> int:
+        """Swap thresholds; analyzers using a changed value are dirtied for all tokens."""
+        mask = 0
+        if thresholds is not None and thresholds != self.thresholds:
+            for name, bit in _THRESHOLD_DEPS.items():
+                if getattr(thresholds, name) != getattr(self.thresholds, name):
+                    mask |= bit
+            self.thresholds = thresholds
+        if instability_threshold is not None and instability_threshold != self.instability_threshold:
+            self.instability_threshold = instability_threshold
+            mask |= RADAR
+        if volatility_threshold is not None and volatility_threshold != self.volatility_threshold:
+            self.volatility_threshold = volatility_threshold
+            mask |= VOLATILITY
+        if mask:
+            for token, entry in self._entries.items():
+                self._mark(token, entry, mask)
+        return mask
+
+    def forget(self, token: str) -> None:
+        self._entries.pop(token, None)
+        self._dirty.discard(token)
+
+    # --------------------------- Scoring -------------------------- #
+
+    def rescore(self) -> List[Transition]:
+        """Recompute dirty analyzers; returns the level transitions since the last call."""
+        transitions: List[Transition] = []
+        thr = self.thresholds
+        for token in self._dirty:
+            entry = self._entries[token]
+            dirty, entry.dirty = entry.dirty, 0
+            if entry.market is None:
+                dirty &= ~MARKET_ANALYZERS
+            if entry.snapshot is None:
+                dirty &= ~RISK_ANALYZERS
+            market = MarketData(*entry.market) if dirty & MARKET_ANALYZERS else None
+            snapshot = TokenSnapshot(*entry.snapshot) if dirty & RISK_ANALYZERS else None
+            results = entry.results
+
+            for bit in (PULSE, TREND, LIQUIDITY, RADAR, VOLATILITY):
+                if not dirty & bit:
+                    continue
+                if bit == PULSE:
+                    new = pulse_track_ex(market, thr)
+                elif bit == TREND:
+                    new = trend_shift_ex(market, thr)
+                elif bit == LIQUIDITY:
+                    new = liquidity_flow_ex(market, thr)
+                elif bit == RADAR:
+                    new = _risk_result(risk_radar(snapshot, self.instability_threshold))
+                else:
+                    new = _risk_result(volatility_predict(snapshot, self.volatility_threshold))
+                self.recomputed += 1
+
+                old = results.get(bit)
+                results[bit] = new
+                if old is None or old[0] is not new[0]:
+                    transitions.append(
+                        Transition(token, ANALYZER_NAMES[bit], old[0] if old else None, new[0], new[1])
+                    )
+        self._dirty.clear()
+        return transitions
+
+    # --------------------------- Results -------------------------- #
+
+    def levels(self, token: str) -> Dict[str, SignalLevel]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return {}
+        return {ANALYZER_NAMES[bit]: res[0] for bit, res in entry.results.items()}
+
+    def signal(self, token: str) -> Optional[str]:
+        """Cached equivalent of ``aggregate_signal`` (as of the last ``rescore``)."""
+        entry = self._entries.get(token)
+        if entry is None or not entry.results.keys() >= {PULSE, TREND, LIQUIDITY}:
+            return None
+        results = [entry.results[PULSE], entry.results[TREND], entry.results[LIQUIDITY]]
+        best = max(results, key=lambda r: _SEVERITY[r[0]])
+        return _signal_msg(best[0], best[1])
+
+    def risk(self, token: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Cached equivalent of ``evaluate_token_risk`` (as of the last ``rescore``)."""
+        entry = self._entries.get(token)
+        if entry is None or not entry.results.keys() >= {RADAR, VOLATILITY}:
+            return None
+        return {
+            "historical_deviation": entry.results[RADAR][2],
+            "volatility_forecast": entry.results[VOLATILITY][2],
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from backend.security._security_scanner import evaluate_token_risk
+    from backend.services.dreamweaver import aggregate_signal
+
+    tokens, rounds, churn = 20_000, 20, 0.05
+    rng = random.Random(7)
+
+    def market() -> MarketData:
+        return MarketData(
+            total_volume=rng.uniform(1e3, 1e6), transaction_frequency=rng.randint(0, 500),
+            price_change=rng.uniform(-0.2, 0.2), previous_price=rng.uniform(0.5, 2.0),
+            previous_volume=rng.uniform(500, 2000), current_price=rng.uniform(0.5, 2.0),
+            token_volume=rng.uniform(0, 1e4), market_liquidity=rng.uniform(1e3, 1e5),
+        )
+
+    def snapshot(m: MarketData) -> TokenSnapshot:
+        return TokenSnapshot(m.current_price, m.previous_price, rng.uniform(0, 1e4), rng.uniform(1e3, 1e5))
+
+    names = [f"tok{i}" for i in range(tokens)]
+    feed = {t: market() for t in names}
+    snaps = {t: snapshot(m) for t, m in feed.items()}
+    cache = ScoringCache()
+    for t in names:
+        cache.update_market(t, feed[t])
+        cache.update_snapshot(t, snaps[t])
+    cache.rescore()
+
+    event_cache = ScoringCache()
+    for t in names:
+        event_cache.update_market(t, feed[t])
+        event_cache.update_snapshot(t, snaps[t])
+    event_cache.rescore()
+
+    full = pushed = evented = 0.0
+    deltas = 0
+    for _ in range(rounds):
+        changed = rng.sample(names, int(tokens * churn))
+        for t in changed:
+            m = feed[t]
+            m.previous_price, m.current_price = m.current_price, m.current_price * rng.uniform(0.9, 1.1)
+            m.transaction_frequency += rng.randint(0, 5)
+            s = snaps[t]
+            s.previous_price, s.current_price = m.previous_price, m.current_price
+
+        t0 = time.process_time()
+        for t in names:
+            aggregate_signal(feed[t])
+            evaluate_token_risk(snaps[t])
+        full += time.process_time() - t0
+
+        t0 = time.process_time()
+        for t in names:                      # feed pushes every token, changed or not
+            cache.update_market(t, feed[t])
+            cache.update_snapshot(t, snaps[t])
+        deltas += len(cache.rescore())
+        pushed += time.process_time() - t0
+
+        t0 = time.process_time()
+        for t in changed:                    # feed pushes only tokens that ticked
+            event_cache.update_market(t, feed[t])
+            event_cache.update_snapshot(t, snaps[t])
+        event_cache.rescore()
+        evented += time.process_time() - t0
+
+    for c in (cache, event_cache):
+        assert all(c.signal(t) == aggregate_signal(feed[t]) for t in names)
+        assert all(c.risk(t) == evaluate_token_risk(snaps[t]) for t in names)
+    print(f"{tokens:,} tokens, {churn:.0%} changed per round, {rounds} rounds, "
+          f"{deltas / rounds:,.0f} transitions/round")
+    print(f"full rescore:          {full / rounds * 1000:7.1f} ms CPU/round")
+    print(f"cache, push all:       {pushed / rounds * 1000:7.1f} ms CPU/round ({full / pushed:.1f}x)")
+    print(f"cache, push changed:   {evented / rounds * 1000:7.1f} ms CPU/round ({full / evented:.1f}x)")
@@ -0,0 +1,272 @@
+"""
+HTTP scoring service around the Python analyzers.
+
+Single-item endpoints (JSON in, JSON out):
+
+    POST /score/signal   MarketData fields        → aggregate_signal()
+    POST /score/risk     TokenSnapshot fields     → evaluate_token_risk()
+    POST /score/trace    {"tx_path": [...]}       → dark_track()
+    POST /score/alert    {"tx_density", "token_age_days", "recent_alerts"} → risk_alert()
+    POST /ingest         {"token", "value"}       → AnomalyScanner state for the token
+
+Concurrent single-item requests of the same kind are coalesced by a
+``MicroBatcher`` into batches of at most ``max_batch`` items, waiting no more
+than ``max_wait`` seconds for a batch to fill.  ``POST /bulk/<kind>`` takes an
+NDJSON body (one item per line) and answers with one NDJSON result per line,
+in order.
+"""
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import asdict, fields
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+from backend.engine.services.session_service import RiskParams, dark_track, risk_alert, risk_alert_batch
+from backend.logic.analysis_engine import AnomalyScanner
+from backend.security._security_scanner import TokenSnapshot, evaluate_token_risk
+from backend.services.dreamweaver import MarketData, Thresholds, aggregate_signal, aggregate_signal_batch
+
+BatchFn = Callable[[List[Any]], List[Any]]
+
+# batch sizes from which the column-wise NumPy path beats the per-item
+# functions (building the columns has a fixed cost; risk_alert is very cheap)
+SIGNAL_VECTOR_MIN = 16
+ALERT_VECTOR_MIN = 256
+
+
+# ---------------------------------------------------------------------------
+# Micro-batching
+# ---------------------------------------------------------------------------
+
+class MicroBatcher:
+    """
+    Collects submitted items on a queue and hands them to *fn* in batches.
+
+    A batch is dispatched as soon as it holds *max_batch* items or the oldest
+    item has waited *max_wait* seconds, whichever comes first.
+    """
+
+    def __init__(self, fn: BatchFn, max_batch: int = 64, max_wait: float = 0.0) -> None:
+        self.fn = fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self.batches = 0
+        self.items = 0
+        self._queue: "Queue[Tuple[Any, Future]]" = Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        fut: Future = Future()
+        self._queue.put((item, fut))
+        return fut
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[Any, Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        outcomes = run_isolated(self.fn, [item for item, _fut in batch])
+        for (_item, fut), (ok, res) in zip(batch, outcomes):
+            if ok:
+                fut.set_result(res)
+            else:
+                fut.set_exception(res)
+
+
+def run_isolated(fn: BatchFn, items: List[Any]) -> List[Tuple[bool, Any]]:
+    """
+    Run *fn* on the whole batch; if it raises, re-run item by item so the
+    exception only reaches the item that caused it.  Returns (ok, result or
+    exception) per item.  Batch functions must not leave partial side effects
+    behind when they raise, since the items are run again.
+    """
+    try:
+        return [(True, res) for res in fn(items)]
+    except Exception as exc:
+        if len(items) == 1:
+            return [(False, exc)]
+    outcomes: List[Tuple[bool, Any]] = []
+    for item in items:
+        try:
+            outcomes.append((True, fn([item])[0]))
+        except Exception as exc:
+            outcomes.append((False, exc))
+    return outcomes
+
+
+# ---------------------------------------------------------------------------
+# Scoring backends (one batch function per kind)
+# ---------------------------------------------------------------------------
+
+def _number(item: Dict[str, Any], key: str, kind: type) -> Any:
+    """Coerce ``item[key]`` to a finite float / int; raises KeyError, TypeError or ValueError."""
+    raw = item[key]
+    if isinstance(raw, bool) or not isinstance(raw, (int, float, str)):
+        raise TypeError(f"{key} must be a number, got {type(raw).__name__}")
+    value = float(raw)
+    if not math.isfinite(value):
+        raise ValueError(f"{key} must be finite, got {raw!r}")
+    if kind is int:
+        if not value.is_integer():
+            raise ValueError(f"{key} must be an integer, got {raw!r}")
+        return int(value)
+    return value
+
+
+def _build(cls: type, item: Dict[str, Any]) -> Any:
+    """Instantiate a numeric dataclass from JSON, coercing each field to its annotated type."""
+    unknown = item.keys() - {f.name for f in fields(cls)}
+    if unknown:
+        raise TypeError(f"unexpected field(s): {', '.join(sorted(unknown))}")
+    return cls(**{f.name: _number(item, f.name, int if f.type in (int, "int") else float) for f in fields(cls)})
+
+
+class ScoringBackend:
+    """Holds analyzer configuration and per-token detector state."""
+
+    def __init__(
+        self,
+        thresholds: Thresholds = Thresholds(),
+        risk_params: RiskParams = RiskParams(),
+        window_size: int = 50,
+    ) -> None:
+        self.thresholds = thresholds
+        self.risk_params = risk_params
+        self.window_size = window_size
+        self.scanners: Dict[str, AnomalyScanner] = {}
+        self._lock = threading.Lock()
+
+    # parse: raw JSON item → argument for the batch function (raises on bad input)
+
+    @staticmethod
+    def parse(kind: str, item: Dict[str, Any]) -> Any:
+        if not isinstance(item, dict):
+            raise TypeError("expected a JSON object")
+        if kind == "signal":
+            return _build(MarketData, item)
+        if kind == "risk":
+            return _build(TokenSnapshot, item)
+        if kind == "trace":
+            path = item["tx_path"]
+            if not isinstance(path, list):
+                raise TypeError("tx_path must be a list")
+            return [str(hop) for hop in path]
+        if kind == "alert":
+            return (_number(item, "tx_density", float), _number(item, "token_age_days", int),
+                    _number(item, "recent_alerts", int))
+        if kind == "ingest":
+            return str(item["token"]), _number(item, "value", float)
+        raise KeyError(kind)
+
+    def batch_fn(self, kind: str) -> BatchFn:
+        return getattr(self, f"_batch_{kind}")
+
+    def _batch_signal(self, items: List[MarketData]) -> List[Dict[str, Any]]:
+        thr = self.thresholds
+        if len(items) < SIGNAL_VECTOR_MIN:
+            return [{"signal": aggregate_signal(data, thr)} for data in items]
+        return [{"signal": msg} for msg in aggregate_signal_batch(items, thr)]
+
+    def _batch_risk(self, items: List[TokenSnapshot]) -> List[Dict[str, Any]]:
+        return [evaluate_token_risk(token) for token in items]
+
+    def _batch_trace(self, items: List[List[str]]) -> List[Dict[str, Any]]:
+        cfg = self.risk_params
+        return [{"status": dark_track(path, cfg).value} for path in items]
+
+    def _batch_alert(self, items: List[Tuple[float, int, int]]) -> List[Dict[str, Any]]:
+        cfg = self.risk_params
+        if len(items) < ALERT_VECTOR_MIN:
+            return [{"level": risk_alert(d, age, n, cfg).value} for d, age, n in items]
+        return [{"level": rating.value} for rating in risk_alert_batch(items, cfg)]
+
+    def _batch_ingest(self, items: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        # values are applied per token in one bulk extend; every item of a token
+        # in this batch reports the state after the whole batch
+        grouped: Dict[str, List[float]] = defaultdict(list)
+        for token, value in items:
+            grouped[token].append(value)
+        states: Dict[str, str] = {}
+        with self._lock:
+            for token, values in grouped.items():
+                scanner = self.scanners.get(token)
+                if scanner is None:
+                    scanner = self.scanners[token] = AnomalyScanner(window_size=self.window_size)
+                scanner.warm(values)
+                states[token] = scanner.state()
+        return [{"token": token, "state": states[token]} for token, _value in items]
+
+
+KINDS = ("signal", "risk", "trace", "alert", "ingest")
+
+
+# ---------------------------------------------------------------------------
+# Flask app
+# ---------------------------------------------------------------------------
+
+def create_app(
+    backend: Optional[ScoringBackend] = None,
+    max_batch: int = 64,
+    max_wait: float = 0.0,
+) -> Flask:
+    backend = backend or ScoringBackend()
+    batchers = {kind: MicroBatcher(backend.batch_fn(kind), max_batch, max_wait) for kind in KINDS}
+    app = Flask(__name__)
+
+    def _score(kind: str):
+        try:
+            arg = backend.parse(kind, request.get_json(force=True))
+        except (TypeError, KeyError, ValueError) as exc:
+            return jsonify({"error": f"invalid {kind} payload: {exc}"}), 400
+        return jsonify(batchers[kind].submit(arg).result())
+
+    for kind in KINDS:
+        path = "/ingest" if kind == "ingest" else f"/score/{kind}"
+        app.add_url_rule(path, f"score_{kind}", lambda kind=kind: _score(kind), methods=["POST"])
+
+    @app.post("/bulk/<kind>")
+    def bulk(kind: str):
+        if kind not in KINDS:
+            return jsonify({"error": f"unknown kind: {kind}"}), 404
+        try:
+            args = [backend.parse(kind, json.loads(line)) for line in request.get_data().splitlines() if line.strip()]
+        except (TypeError, KeyError, ValueError) as exc:
+            return jsonify({"error": f"invalid {kind} payload: {exc}"}), 400
+        fn = backend.batch_fn(kind)
+        results: List[Any] = []
+        for start in range(0, len(args), max_batch):
+            for ok, res in run_isolated(fn, args[start:start + max_batch]):
+                results.append(res if ok else {"error": f"{type(res).__name__}: {res}"})
+        body = "\n".join(json.dumps(res, separators=(",", ":")) for res in results)
+        return Response(body + "\n" if body else "", mimetype="application/x-ndjson")
+
+    @app.get("/health")
+    def health():
+        return jsonify({
+            "status": "ok",
+            "tokens": len(backend.scanners),
+            "batches": {
+                kind: {"batches": b.batches, "items": b.items, "avg_size": b.items / b.batches if b.batches else 0.0}
+                for kind, b in batchers.items()
+            },
+            "thresholds": asdict(backend.thresholds),
+        })
+
+    return app
@@ -1,4 +1,5 @@
-import numpy as np
+# NumPy is imported lazily by the helpers that need it; most callers only use
+# the pure-Python functions and should not pay its import cost.
 
 
 def calculate_z_score(value: float, mean: float, std_dev: float) -> float:
@@ -37,6 +38,8 @@ def rolling_average(data: list[float], window: int = 3) -> list[float]:
 def detect_outliers_z(data: list[float], threshold: float = 2.5) -> list[float]:
     if not data:
         return []
+    import numpy as np
+
     mean, std_dev = np.mean(data), np.std(data)
     if std_dev == 0:
         return []
@@ -59,4 +62,6 @@ def spike_score(current: float, baseline: float) -> float:
 
 
 def vector_magnitude(vector: list[float]) -> float:
+    import numpy as np
+
     return round(np.linalg.norm(vector), 4)
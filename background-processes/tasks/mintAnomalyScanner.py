@@ -1,32 +1,44 @@
 import time
 from datetime import datetime
-from solana.rpc.api import Client
+
+from mintBlockDecoder import BLOCK_CONFIG, decode_block_mints
 
 RPC_ENDPOINT = "https://api.mainnet-beta.solana.com"
 SCAN_INTERVAL_SECONDS = 600  # 10 минут
+SEEDER_WINDOW_SECONDS = 24 * 3600
+SEEDER_MINT_THRESHOLD = 5
+
+# One client per endpoint, created on first use. solana-py is imported lazily
+# because it dominates start-up time of short-lived runs.
+_clients = {}
+
+
+def get_client(endpoint=RPC_ENDPOINT):
+    client = _clients.get(endpoint)
+    if client is None:
+        from solana.rpc.api import Client
+
+        client = _clients[endpoint] = Client(endpoint)
+    return client
+
 
-client = Client(RPC_ENDPOINT)
+def fetch_block(slot):
+    """getBlock with raw base64 transactions and no rewards (see BLOCK_CONFIG)."""
+    from solana.rpc.types import RPCMethod
+
+    return get_client()._provider.make_request(RPCMethod("getBlock"), slot, BLOCK_CONFIG)
 
 
 def fetch_recent_mints(limit=50):
+    client = get_client()
     current_slot = client.get_slot()["result"]
     mints = []
 
     for slot in range(current_slot - limit, current_slot):
-        block = client.get_block(slot)
+        block = fetch_block(slot)
         if not block.get("result"):
             continue
-
-        for tx in block["result"].get("transactions", []):
-            for instr in tx["transaction"]["message"]["instructions"]:
-                if isinstance(instr, dict) and instr.get("program") == "spl-token":
-                    parsed = instr.get("parsed", {})
-                    if parsed.get("type") == "initializeMint":
-                        mints.append({
-                            "mint": parsed["info"].get("mint"),
-                            "authority": parsed["info"].get("authority"),
-                            "timestamp": block["result"].get("blockTime")
-                        })
+        mints.extend(decode_block_mints(block["result"]))
 
     return mints
 
@@ -38,14 +50,24 @@ def log_mint_activity(mints):
         print(f" • Mint: {mint['mint']}, Authority: {mint['authority']}, Time: {timestamp}")
 
 
+def log_seeder_alert(alert):
+    print(f"[{datetime.utcnow().isoformat()}] Token Seeder: {alert['authority']} spawned "
+          f"{alert['count']} mint(s) within {alert['window'] // 3600}h: {', '.join(alert['mints'])}")
+
+
 def run_tracker():
+    from mintAuthorityIndex import MintAuthorityIndex
+
+    index = MintAuthorityIndex(window=SEEDER_WINDOW_SECONDS, spawn_threshold=SEEDER_MINT_THRESHOLD)
     while True:
         try:
-            new_mints = fetch_recent_mints()
+            new_mints, alerts = index.observe_many(fetch_recent_mints())
             if new_mints:
                 log_mint_activity(new_mints)
             else:
                 print(f"[{datetime.utcnow().isoformat()}] No new mints found.")
+            for alert in alerts:
+                log_seeder_alert(alert)
         except Exception as e:
             print(f"[ERROR] {e}")
 
@@ -0,0 +1,175 @@
+import math
+import time
+from collections import OrderedDict, deque
+from hashlib import blake2b
+
+# Authority -> mints index for spotting serial minters ("Token Seeder"
+# behaviour, see payloads/smartWalletTrace.json tokensSpawned).
+
+
+class BloomFilter:
+    def __init__(self, capacity=200_000, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """Insert key; returns True if it was (probably) present already."""
+        present = True
+        bits = self.bits
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RotatingBloom:
+    """Two Bloom generations swapped every `period` seconds: memory stays fixed,
+    and a key is remembered for between one and two periods."""
+
+    def __init__(self, period, capacity=200_000, error_rate=0.001):
+        self.period = period
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = BloomFilter(capacity, error_rate)
+        self.rotated_at = None
+
+    def _maybe_rotate(self, now):
+        if self.rotated_at is None:
+            self.rotated_at = now
+        elif now - self.rotated_at >= self.period or self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+            self.rotated_at = now
+
+    def add(self, key, now):
+        self._maybe_rotate(now)
+        if key in self.previous:
+            self.current.add(key)
+            return True
+        return self.current.add(key)
+
+    def __contains__(self, key):
+        return key in self.current or key in self.previous
+
+
+class MintAuthorityIndex:
+    """
+    Incremental authority -> recent mints index.
+
+    • mints are de-duplicated through a rotating Bloom filter (cheap "seen?" gate;
+      a false positive drops a new mint with probability ~error_rate)
+    • each authority keeps a deque of (timestamp, mint) inside the sliding window
+    • an alert is raised once when an authority reaches `spawn_threshold` mints
+      within `window` seconds, and re-armed when it falls back below
+    • authorities with no mint inside the window are evicted, so memory is
+      bounded by the window's activity, not by uptime
+    """
+
+    def __init__(self, window=3600, spawn_threshold=5, bloom_capacity=200_000, error_rate=0.001):
+        self.window = window
+        self.spawn_threshold = spawn_threshold
+        self.seen = RotatingBloom(window, bloom_capacity, error_rate)
+        self.authorities = OrderedDict()   # authority -> deque[(ts, mint)], least recent first
+        self.alerted = set()
+
+    def _expire(self, authority, mints, now):
+        cutoff = now - self.window
+        while mints and mints[0][0] <= cutoff:
+            mints.popleft()
+        if len(mints) < self.spawn_threshold:
+            self.alerted.discard(authority)
+
+    def evict(self, now):
+        cutoff = now - self.window
+        while self.authorities:
+            authority, mints = next(iter(self.authorities.items()))
+            if mints and mints[-1][0] > cutoff:
+                break
+            del self.authorities[authority]
+            self.alerted.discard(authority)
+
+    def observe(self, mint, authority, timestamp=None):
+        """Record one mint event; returns an alert dict or None."""
+        now = timestamp if timestamp is not None else time.time()
+        if not mint or self.seen.add(mint, now):
+            return None
+        if authority is None:               # mint authority unknown: seen, but not attributed
+            return None
+
+        mints = self.authorities.get(authority)
+        if mints is None:
+            mints = self.authorities[authority] = deque()
+        else:
+            self.authorities.move_to_end(authority)
+        mints.append((now, mint))
+        self._expire(authority, mints, now)
+        self.evict(now)
+
+        if len(mints) >= self.spawn_threshold and authority not in self.alerted:
+            self.alerted.add(authority)
+            return {
+                "authority": authority,
+                "mints": [m for _ts, m in mints],
+                "count": len(mints),
+                "window": self.window,
+                "timestamp": now,
+            }
+        return None
+
+    def observe_many(self, mints):
+        """Feed fetch_recent_mints() output; returns (new_mints, alerts)."""
+        fresh, alerts = [], []
+        for item in mints:
+            if not item["mint"] or item["mint"] in self.seen:
+                continue
+            alert = self.observe(item["mint"], item["authority"], item["timestamp"])
+            fresh.append(item)
+            if alert:
+                alerts.append(alert)
+        return fresh, alerts
+
+    def count(self, authority, now=None):
+        mints = self.authorities.get(authority)
+        if not mints:
+            return 0
+        self._expire(authority, mints, now if now is not None else time.time())
+        return len(mints)
+
+    def mints_of(self, authority):
+        return [m for _ts, m in self.authorities.get(authority, ())]
+
+
+if __name__ == "__main__":
+    import random
+
+    index = MintAuthorityIndex(window=3600, spawn_threshold=5)
+    t = 1_700_000_000
+    seeders = {f"Seeder{i}" for i in range(3)}
+    authorities = [f"Auth{i}" for i in range(50_000)] + list(seeders)
+    alerts = 0
+    t0 = time.perf_counter()
+    for i in range(300_000):
+        authority = random.choice(list(seeders)) if i % 500 == 0 else random.choice(authorities)
+        alerts += index.observe(f"Mint{i}", authority, t + i * 0.5) is not None
+        index.observe(f"Mint{i}", authority, t + i * 0.5)   # duplicate sighting
+    elapsed = time.perf_counter() - t0
+    print(f"600,000 events in {elapsed:.2f}s ({600_000 / elapsed:,.0f}/s), alerts={alerts}, "
+          f"tracked authorities={len(index.authorities):,}, bloom={2 * len(index.seen.current.bits) / 1e6:.2f} MB")
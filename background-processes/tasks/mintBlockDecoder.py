@@ -0,0 +1,114 @@
+from binascii import a2b_base64
+
+# Selective decoder for getBlock responses fetched with BLOCK_CONFIG.
+#
+# Transactions arrive as raw base64 wire bytes. A transaction is only parsed
+# if the spl-token program id occurs in its bytes, and inside it only the
+# token-program instructions are looked at; base58 strings are produced for
+# the handful of keys we actually report.
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+# narrowest getBlock request that still carries instructions
+BLOCK_CONFIG = {
+    "encoding": "base64",
+    "transactionDetails": "full",
+    "rewards": False,
+    "maxSupportedTransactionVersion": 0,
+}
+
+INITIALIZE_MINT = 0
+INITIALIZE_MINT2 = 20
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {c: i for i, c in enumerate(_B58_ALPHABET)}
+
+
+def b58encode(raw):
+    n = int.from_bytes(raw, "big")
+    out = []
+    while n:
+        n, rem = divmod(n, 58)
+        out.append(_B58_ALPHABET[rem])
+    pad = len(raw) - len(bytes(raw).lstrip(b"\0"))
+    return "1" * pad + "".join(reversed(out))
+
+
+def b58decode(text):
+    n = 0
+    for c in text:
+        n = n * 58 + _B58_INDEX[c]
+    pad = len(text) - len(text.lstrip("1"))
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big") if n else b""
+    return b"\0" * pad + body
+
+
+TOKEN_PROGRAM_BYTES = b58decode(TOKEN_PROGRAM_ID)
+
+
+def _compact_u16(buf, pos):
+    """Solana short_vec length; returns (value, new_pos)."""
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _init_mints(raw, loaded=None):
+    """Yield (mint, authority) for top-level InitializeMint(2) instructions in one wire tx."""
+    buf = memoryview(raw)
+    n_sigs, pos = _compact_u16(buf, 0)
+    pos += 64 * n_sigs
+    if buf[pos] & 0x80:          # versioned message prefix
+        pos += 1
+    pos += 3                     # message header
+    n_keys, pos = _compact_u16(buf, pos)
+    keys_at = pos
+    pos += 32 * n_keys + 32      # account keys + recent blockhash
+
+    token_idx = None
+    for i in range(n_keys):
+        if buf[keys_at + 32 * i:keys_at + 32 * (i + 1)] == TOKEN_PROGRAM_BYTES:
+            token_idx = i
+            break
+    if token_idx is None:        # the id only appeared in data / lookup tables
+        return
+
+    def key(idx):
+        if idx < n_keys:
+            return b58encode(buf[keys_at + 32 * idx:keys_at + 32 * (idx + 1)])
+        extra = (loaded or {}).get("writable", []) + (loaded or {}).get("readonly", [])
+        idx -= n_keys
+        return extra[idx] if idx < len(extra) else None
+
+    n_ix, pos = _compact_u16(buf, pos)
+    for _ in range(n_ix):
+        program_idx = buf[pos]
+        n_acc, pos = _compact_u16(buf, pos + 1)
+        acc_at = pos
+        pos += n_acc
+        n_data, pos = _compact_u16(buf, pos)
+        data_at = pos
+        pos += n_data
+        if program_idx != token_idx or not n_data or n_acc < 1:
+            continue
+        if buf[data_at] in (INITIALIZE_MINT, INITIALIZE_MINT2) and n_data >= 34:
+            yield key(buf[acc_at]), b58encode(buf[data_at + 2:data_at + 34])
+
+
+def decode_block_mints(block):
+    """Mints created in a getBlock result fetched with BLOCK_CONFIG."""
+    mints = []
+    block_time = block.get("blockTime")
+    for tx in block.get("transactions", ()):
+        raw = a2b_base64(tx["transaction"][0])
+        if TOKEN_PROGRAM_BYTES not in raw:
+            continue
+        loaded = (tx.get("meta") or {}).get("loadedAddresses")
+        for mint, authority in _init_mints(raw, loaded):
+            mints.append({"mint": mint, "authority": authority, "timestamp": block_time})
+    return mints
@@ -0,0 +1,171 @@
+import json
+import random
+import time
+from binascii import b2a_base64
+
+from mintBlockDecoder import TOKEN_PROGRAM_ID, b58decode, b58encode, decode_block_mints
+
+# Compares the previous jsonParsed block walk with the selective base64
+# decoder on canned blocks: CPU per block (JSON decode + mint extraction) and
+# response bytes. Fixtures are generated deterministically so both paths see
+# the same transactions.
+
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+RENT_SYSVAR = "SysvarRent111111111111111111111111111111111"
+TX_PER_BLOCK = 1500
+MINT_EVERY = 300          # one initializeMint per 300 tx
+TOKEN_TRANSFER_EVERY = 4  # token-program traffic that passes the byte pre-filter
+
+
+def _compact(n):
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _wire_tx(keys, instructions):
+    """Legacy transaction bytes: keys are 32-byte strings, instructions (program_idx, accounts, data)."""
+    msg = bytearray([1, 0, 1]) + _compact(len(keys)) + b"".join(keys) + random.randbytes(32)
+    msg += _compact(len(instructions))
+    for program_idx, accounts, data in instructions:
+        msg += bytes([program_idx]) + _compact(len(accounts)) + bytes(accounts) + _compact(len(data)) + data
+    return _compact(1) + random.randbytes(64) + bytes(msg)
+
+
+def _meta(n_keys):
+    return {
+        "err": None,
+        "fee": 5000,
+        "preBalances": [random.randrange(10 ** 9) for _ in range(n_keys)],
+        "postBalances": [random.randrange(10 ** 9) for _ in range(n_keys)],
+        "innerInstructions": [],
+        "logMessages": [f"Program {SYSTEM_PROGRAM_ID} invoke [1]", f"Program {SYSTEM_PROGRAM_ID} success"],
+        "preTokenBalances": [],
+        "postTokenBalances": [],
+        "status": {"Ok": None},
+    }
+
+
+def make_block(seed):
+    """Return (json_parsed_block, base64_block, expected_mints) for one slot."""
+    random.seed(seed)
+    token = b58decode(TOKEN_PROGRAM_ID)
+    system = b58decode(SYSTEM_PROGRAM_ID)
+    rent = b58decode(RENT_SYSVAR)
+    parsed_txs, raw_txs, expected = [], [], []
+
+    for i in range(TX_PER_BLOCK):
+        payer, other = random.randbytes(32), random.randbytes(32)
+        if i % MINT_EVERY == 0:
+            authority = random.randbytes(32)
+            keys = [payer, other, rent, token]
+            data = bytes([0, 6]) + authority + b"\0"
+            ixs = [(3, [1, 2], data)]
+            parsed_ix = {
+                "program": "spl-token",
+                "programId": TOKEN_PROGRAM_ID,
+                "parsed": {"type": "initializeMint", "info": {
+                    "mint": b58encode(other), "decimals": 6,
+                    "mintAuthority": b58encode(authority), "rentSysvar": RENT_SYSVAR}},
+            }
+            expected.append(b58encode(other))
+        elif i % TOKEN_TRANSFER_EVERY == 0:
+            keys = [payer, other, random.randbytes(32), token]
+            data = bytes([3]) + random.randrange(10 ** 9).to_bytes(8, "little")
+            ixs = [(3, [1, 2, 0], data)]
+            parsed_ix = {
+                "program": "spl-token",
+                "programId": TOKEN_PROGRAM_ID,
+                "parsed": {"type": "transfer", "info": {
+                    "source": b58encode(other), "destination": b58encode(keys[2]),
+                    "authority": b58encode(payer), "amount": str(int.from_bytes(data[1:], "little"))}},
+            }
+        else:
+            keys = [payer, other, system]
+            data = bytes([2, 0, 0, 0]) + random.randrange(10 ** 9).to_bytes(8, "little")
+            ixs = [(2, [0, 1], data)]
+            parsed_ix = {
+                "program": "system",
+                "programId": SYSTEM_PROGRAM_ID,
+                "parsed": {"type": "transfer", "info": {
+                    "source": b58encode(payer), "destination": b58encode(other),
+                    "lamports": int.from_bytes(data[4:], "little")}},
+            }
+
+        meta = _meta(len(keys))
+        raw_txs.append({"transaction": [b2a_base64(_wire_tx(keys, ixs), newline=False).decode(), "base64"],
+                        "meta": meta, "version": "legacy"})
+        parsed_txs.append({
+            "transaction": {
+                "signatures": [b58encode(random.randbytes(64))],
+                "message": {
+                    "accountKeys": [{"pubkey": b58encode(k), "signer": j == 0, "writable": j < 2,
+                                     "source": "transaction"} for j, k in enumerate(keys)],
+                    "recentBlockhash": b58encode(random.randbytes(32)),
+                    "instructions": [parsed_ix],
+                },
+            },
+            "meta": meta,
+            "version": "legacy",
+        })
+
+    header = {"blockHeight": 250_000_000 + seed, "blockTime": 1_700_000_000 + seed,
+              "blockhash": b58encode(random.randbytes(32)), "parentSlot": 260_000_000 + seed,
+              "previousBlockhash": b58encode(random.randbytes(32))}
+    rewards = [{"pubkey": b58encode(random.randbytes(32)), "lamports": 5000 * TX_PER_BLOCK,
+                "postBalance": 10 ** 12, "rewardType": "Fee", "commission": None}]
+    parsed = dict(header, transactions=parsed_txs, rewards=rewards)
+    raw = dict(header, transactions=raw_txs)
+    return ({"jsonrpc": "2.0", "result": parsed, "id": 1},
+            {"jsonrpc": "2.0", "result": raw, "id": 1}, expected)
+
+
+def parsed_block_mints(block):
+    """The previous fetch_recent_mints loop over a jsonParsed block."""
+    mints = []
+    for tx in block["result"].get("transactions", []):
+        for instr in tx["transaction"]["message"]["instructions"]:
+            if isinstance(instr, dict) and instr.get("program") == "spl-token":
+                parsed = instr.get("parsed", {})
+                if parsed.get("type") == "initializeMint":
+                    mints.append({
+                        "mint": parsed["info"].get("mint"),
+                        "authority": parsed["info"].get("authority"),
+                        "timestamp": block["result"].get("blockTime")
+                    })
+    return mints
+
+
+def bench(blocks=10):
+    fixtures = [make_block(seed) for seed in range(blocks)]
+    bodies = [(json.dumps(p), json.dumps(r), exp) for p, r, exp in fixtures]
+
+    t_old = t_new = 0.0
+    bytes_old = bytes_new = 0
+    for parsed_body, raw_body, expected in bodies:
+        bytes_old += len(parsed_body)
+        bytes_new += len(raw_body)
+
+        t0 = time.process_time()
+        old = parsed_block_mints(json.loads(parsed_body))
+        t_old += time.process_time() - t0
+
+        t0 = time.process_time()
+        new = decode_block_mints(json.loads(raw_body)["result"])
+        t_new += time.process_time() - t0
+
+        assert [m["mint"] for m in old] == expected == [m["mint"] for m in new]
+
+    print(f"{blocks} blocks x {TX_PER_BLOCK} tx, {TX_PER_BLOCK // MINT_EVERY} mints per block")
+    print(f"jsonParsed: {t_old / blocks * 1000:7.2f} ms CPU/block  {bytes_old / blocks / 1e6:6.2f} MB/block")
+    print(f"base64:     {t_new / blocks * 1000:7.2f} ms CPU/block  {bytes_new / blocks / 1e6:6.2f} MB/block")
+
+
+if __name__ == "__main__":
+    bench()
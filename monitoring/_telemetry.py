@@ -3,7 +3,7 @@ import statistics
 import time
 from collections import deque
 from datetime import datetime
-from typing import Deque, List, Optional, Callable
+from typing import Any, Deque, Iterable, List, Optional, Callable
 
 ###############################################################################
 # Logging setup
@@ -62,23 +62,54 @@ def detect_outliers(
 class StreamWatch:
     """
     Rolling window monitor that tracks the most recent *window_size* values
-    and detects anomalies on demand.
+    and detects anomalies on demand.  An optional *rollup* (e.g.
+    RollupPyramid) is fed every event and backs ``baseline_z``.
     """
 
     def __init__(
         self,
         window_size: int = 300,
-        anomaly_callback: Optional[Callable[[List[float]], None]] = None
+        anomaly_callback: Optional[Callable[[List[float]], None]] = None,
+        rollup: Optional[Any] = None,
     ) -> None:
         self.window: Deque[float] = deque(maxlen=window_size)
         self.anomaly_callback = anomaly_callback
+        self.rollup = rollup
 
-    def add_event(self, value: float) -> None:
+    def add_event(self, value: float, ts: Optional[float] = None) -> None:
         """Append a new datapoint and emit a log entry."""
         timestamp = datetime.utcnow().isoformat()
         self.window.append(value)
+        if self.rollup is not None:
+            self.rollup.add(value, ts)
         log_event("event", f"value={value:.2f} at {timestamp}")
 
+    def warm(self, values: Iterable[float], ts: Optional[Iterable[float]] = None) -> None:
+        """
+        Bulk-load historical datapoints (oldest first) without per-event logging.
+        With timestamps *ts* the values are also replayed into the rollup.
+        """
+        values = [float(v) for v in values]
+        self.window.extend(values)
+        if self.rollup is not None and ts is not None:
+            self.rollup.add_many(zip(ts, values))
+        log_event("warm", f"size={len(self.window)}")
+
+    def baseline_z(self, value: Optional[float] = None, level: int = -1,
+                   now: Optional[float] = None) -> float:
+        """
+        z-score of *value* (default: latest datapoint) against the rollup's
+        long baseline as of *now* (default: the rollup's clock).
+        """
+        if self.rollup is None:
+            return 0.0
+        if value is None:
+            if not self.window:
+                return 0.0
+            value = self.window[-1]
+        self.rollup.advance(now)
+        return self.rollup.zscore(value, level)
+
     def check_for_anomalies(self) -> Optional[List[float]]:
         """Return list of anomalies, invoke callback if provided."""
         if not self.window: